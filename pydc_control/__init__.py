@@ -6,12 +6,21 @@ NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
 with the terms of the Adobe license agreement accompanying it.
 """
 
-from .cli import run
-from .commands import call_commands
-from .data import Project, Service
+import importlib
+
 from .exceptions import KnownException
 
 
+# Public names that are only imported from their submodule on first access, this keeps
+# "import pydc_control" from loading the full docker/template stack up-front
+_LAZY_ATTRIBUTES = {
+    "run": ("pydc_control.cli", "run"),
+    "call_commands": ("pydc_control.commands", "call_commands"),
+    "Project": ("pydc_control.data", "Project"),
+    "Service": ("pydc_control.data", "Service"),
+}
+
+
 __all__ = [
     "run",
     "call_commands",
@@ -19,3 +28,17 @@ __all__ = [
     "Service",
     "KnownException",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute_name = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name), attribute_name)
+    # Store the value so that further accesses do not go through this function
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
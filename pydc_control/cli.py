@@ -10,11 +10,29 @@ import argparse
 import os
 from typing import Callable, List, Optional, Sequence
 
-from . import commands, config, log
+from . import config, log
+from .log import LOGGER
 from .data import Project, Service
 from .exceptions import KnownException
 
 
+# Docker compose alias commands that take no arguments of their own, as (command, command function, help)
+_DC_ALIAS_COMMANDS = (
+    ("config", "run_dc_config", 'Alias for the "dc config" command'),
+    ("down", "run_dc_down", 'Alias for the "dc down" command'),
+    ("pull", "run_dc_pull", 'Alias for the "dc pull" command'),
+    ("rm", "run_dc_rm", 'Alias for the "dc rm --force" command'),
+    ("stop", "run_dc_stop", 'Alias for the "dc stop" command'),
+    ("up", "run_dc_up", 'Alias for the "dc up" command'),
+    ("up-detach", "run_dc_up_detach", 'Alias for the "dc up --detach" command'),
+    (
+        "up-recreate",
+        "run_dc_up_recreate",
+        'Alias for the "dc up --force-recreate" command',
+    ),
+)
+
+
 def _get_print_help_func(parser):
     # pylint: disable=unused-argument
     def print_help(args: argparse.Namespace):
@@ -24,6 +42,41 @@ def _get_print_help_func(parser):
     return print_help
 
 
+def _get_command_func(func_name: str) -> Callable[[argparse.Namespace], int]:
+    def run_command(args: argparse.Namespace) -> int:
+        # The commands module (and the docker utilities it needs) is only imported once a command is run,
+        # so that --help and argument errors do not pay for it
+        # pylint: disable=import-outside-toplevel
+        from . import commands
+
+        return getattr(commands, func_name)(args)
+
+    run_command.__name__ = func_name
+    return run_command
+
+
+def _add_all_projects_argument(
+    command_parser: argparse.ArgumentParser, help_text: str
+) -> None:
+    command_parser.add_argument(
+        "-a",
+        "--all-projects",
+        dest="all_projects",
+        action="store_true",
+        help=help_text,
+    )
+
+
+def _add_no_parallel_argument(command_parser: argparse.ArgumentParser) -> None:
+    command_parser.add_argument(
+        "--no-parallel",
+        dest="no_parallel",
+        action="store_true",
+        help="Run git for one project at a time instead of in parallel, with git output written "
+        "directly to the terminal.",
+    )
+
+
 def _parse_args(
     configure_parsers: Optional[Callable], args: Optional[Sequence[str]]
 ) -> argparse.Namespace:
@@ -83,7 +136,11 @@ def _parse_args(
             f"project, enabled by default",
         )
 
-    subparsers = parser.add_subparsers(title="Commands", help="commands")
+    subparsers = parser.add_subparsers(
+        title="Commands",
+        help="commands",
+        dest="command",
+    )
 
     # Help shortcut
     # help_parser = subparsers.add_parser(
@@ -99,15 +156,9 @@ def _parse_args(
         help="Clones and/or updates repositories for all specified projects",
     )
     checkout_parser.set_defaults(
-        func=commands.run_checkout,
-    )
-    checkout_parser.add_argument(
-        "-a",
-        "--all-projects",
-        dest="all_projects",
-        action="store_true",
-        help="Checkout/clone all projects.",
+        func=_get_command_func("run_checkout"),
     )
+    _add_all_projects_argument(checkout_parser, "Checkout/clone all projects.")
     checkout_parser.add_argument(
         "-e",
         "--extra-remote",
@@ -118,6 +169,7 @@ def _parse_args(
         help="Add a remote when cloning/checking out. Each flag can take 1-2 params, 1 param should be the space "
         "the remote exists in github. If a 2nd param is specified it is an optional name for the remote.",
     )
+    _add_no_parallel_argument(checkout_parser)
 
     # Repo Status
     repo_status_parser = subparsers.add_parser(
@@ -126,15 +178,10 @@ def _parse_args(
         help="gets the status of the repos associated with this control script",
     )
     repo_status_parser.set_defaults(
-        func=commands.get_repo_status,
-    )
-    repo_status_parser.add_argument(
-        "-a",
-        "--all-projects",
-        dest="all_projects",
-        action="store_true",
-        help="Get the status of all projects.",
+        func=_get_command_func("get_repo_status"),
     )
+    _add_all_projects_argument(repo_status_parser, "Get the status of all projects.")
+    _add_no_parallel_argument(repo_status_parser)
 
     # Docker Status
     # Init
@@ -143,7 +190,7 @@ def _parse_args(
         help="Generates docker-compose templates and copies configuration, but does not run any commands",
     )
     init_parser.set_defaults(
-        func=commands.run_dc_init,
+        func=_get_command_func("run_dc_init"),
     )
 
     # Docker compose
@@ -153,7 +200,7 @@ def _parse_args(
         help="Generates docker-compose templates, copies configuration, and runs any docker-compose command",
     )
     dc_parser.set_defaults(
-        func=commands.run_docker_compose,
+        func=_get_command_func("run_docker_compose"),
     )
     dc_parser.add_argument(
         "docker_compose_args",
@@ -171,57 +218,19 @@ def _parse_args(
         action="store_true",
         help="Do not use cache when building the image.",
     )
-    build_parser.add_argument(
-        "-a",
-        "--all-projects",
-        dest="all_projects",
-        action="store_true",
-        help="Builds all projects instead of just those specified or by using the current directory,"
+    _add_all_projects_argument(
+        build_parser,
+        "Builds all projects instead of just those specified or by using the current directory,"
         "this is assumed if no projects are specified.",
     )
     build_parser.set_defaults(
-        func=commands.run_dc_build,
-    )
-    config_parser = subparsers.add_parser(
-        "config", help='Alias for the "dc config" command'
-    )
-    config_parser.set_defaults(
-        func=commands.run_dc_config,
-    )
-    down_parser = subparsers.add_parser("down", help='Alias for the "dc down" command')
-    down_parser.set_defaults(
-        func=commands.run_dc_down,
-    )
-    pull_parser = subparsers.add_parser("pull", help='Alias for the "dc pull" command')
-    pull_parser.set_defaults(
-        func=commands.run_dc_pull,
-    )
-    rm_parser = subparsers.add_parser(
-        "rm", help='Alias for the "dc rm --force" command'
-    )
-    rm_parser.set_defaults(
-        func=commands.run_dc_rm,
-    )
-    stop_parser = subparsers.add_parser("stop", help='Alias for the "dc stop" command')
-    stop_parser.set_defaults(
-        func=commands.run_dc_stop,
-    )
-    up_parser = subparsers.add_parser("up", help='Alias for the "dc up" command')
-    up_parser.set_defaults(
-        func=commands.run_dc_up,
-    )
-    up_detach_parser = subparsers.add_parser(
-        "up-detach", help='Alias for the "dc up --detach" command'
-    )
-    up_detach_parser.set_defaults(
-        func=commands.run_dc_up_detach,
-    )
-    up_recreate_parser = subparsers.add_parser(
-        "up-recreate", help='Alias for the "dc up --force-recreate" command'
-    )
-    up_recreate_parser.set_defaults(
-        func=commands.run_dc_up_recreate,
+        func=_get_command_func("run_dc_build"),
     )
+    for command_name, func_name, command_help in _DC_ALIAS_COMMANDS:
+        alias_parser = subparsers.add_parser(command_name, help=command_help)
+        alias_parser.set_defaults(
+            func=_get_command_func(func_name),
+        )
 
     # Do not allow to pull configuration unless there is a project for config
     config_service_target = Service.find_config()
@@ -230,7 +239,7 @@ def _parse_args(
             "pull-config", help='Alias for the "dc pull" command'
         )
         pull_config_parser.set_defaults(
-            func=commands.run_dc_pull_config,
+            func=_get_command_func("run_dc_pull_config"),
         )
 
     if configure_parsers:
@@ -248,17 +257,16 @@ def _validate_args(args: argparse.Namespace) -> int:
     :return: the exit code (or 0 on successful validation)
     """
     # Configure extra remotes
-    if "extra_remotes" in args.__dict__ and len(args.extra_remotes) > 0:
-        for remote in args.extra_remotes:
-            if len(remote) > 2 or len(remote) < 1:
-                log.get_logger().error(
-                    "extra remotes parameters must take either 1 or 2 parameters for each specification."
-                )
-                log.get_logger().error("example : -e origin bob")
-                log.get_logger().error(
-                    "      where origin is the remote name and bob is the space the repo is forked in"
-                )
-                return os.EX_USAGE
+    extra_remotes = getattr(args, "extra_remotes", ())
+    if any(len(remote) not in (1, 2) for remote in extra_remotes):
+        LOGGER.error(
+            "extra remotes parameters must take either 1 or 2 parameters for each specification."
+        )
+        LOGGER.error("example : -e origin bob")
+        LOGGER.error(
+            "      where origin is the remote name and bob is the space the repo is forked in"
+        )
+        return os.EX_USAGE
 
     # Make sure the config service is not disabled at the same time it is being developed
     config_service_target = Service.find_config()
@@ -268,7 +276,7 @@ def _validate_args(args: argparse.Namespace) -> int:
         and config_service_target.project_name in args.dev_project_names
         and not config_service_target.is_enabled(args)
     ):
-        log.get_logger().error(
+        LOGGER.error(
             f"To use the config service, you must not be developing on the "
             f"{config_service_target.project_name} project."
         )
@@ -278,13 +286,11 @@ def _validate_args(args: argparse.Namespace) -> int:
 
 def _detect_current_project(dev_project_names: List[str]) -> None:
     dir_name = os.path.basename(os.getcwd())
-    base_dir_name = os.path.basename(config.get_base_dir())
-    if dir_name != base_dir_name:
-        for project in Project.find_all():
-            if project.directory == dir_name and project.name not in dev_project_names:
-                log.get_logger().info(
-                    f"Assuming development for project {project.name}"
-                )
+    if dir_name != config.get_base_dir_name():
+        # Several projects may be checked out to the same directory, they are all developed
+        for project in Project.find_all_by_directory(dir_name):
+            if project.name not in dev_project_names:
+                LOGGER.info("Assuming development for project %s", project.name)
                 dev_project_names.append(project.name)
 
 
@@ -309,7 +315,9 @@ def run(
     # Initialize logging
     log.init_logger(args.debug)
 
-    _detect_current_project(args.dev_project_names)
+    # Without a command only the help is printed, so there is no project to detect
+    if args.command:
+        _detect_current_project(args.dev_project_names)
     errno = _validate_args(args)
     if errno:
         return errno
@@ -317,12 +325,11 @@ def run(
     try:
         return args.func(args)
     except KnownException as exc:
-        log.get_logger().error(str(exc))
-        return os.EX_SOFTWARE
+        LOGGER.error("%s", exc)
     except Exception as exc:  # pylint:disable=broad-except
-        log.get_logger().error(
-            f"Encountered an unexpected failure ({exc.__class__}): {exc}"
+        LOGGER.error(
+            "Encountered an unexpected failure (%s): %s", type(exc).__name__, exc
         )
         if args.debug:
             raise
-        return os.EX_SOFTWARE
+    return os.EX_SOFTWARE
@@ -11,48 +11,85 @@ import os
 import shutil
 import signal
 import subprocess
+import sys
 import time
-from typing import Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 
-from pre_commit.constants import CONFIG_FILE as PRE_COMMIT_CONFIG_FILE
-
-from . import config, docker_compose_utils, docker_utils, log
+from . import config, docker_compose_utils, docker_utils
 from .data import Project, Service
 from .exceptions import KnownException
+from .log import LOGGER
+
+
+# The maximum number of git commands to run at the same time for checkout and repo status
+_MAX_GIT_WORKERS = 8
+
+# The delays in seconds between checks while waiting for the ports of a container to be open
+_WAIT_INITIAL_DELAY = 0.02
+_WAIT_MAX_DELAY = 0.5
+
+
+def _get_wait_delays() -> Iterator[float]:
+    # Poll quickly at first since most services open their ports soon after starting, then back off
+    delay = _WAIT_INITIAL_DELAY
+    while True:
+        yield delay
+        delay = min(delay * 1.5, _WAIT_MAX_DELAY)
 
 
 def _wait_for_open_ports(service: Service) -> None:
-    log.get_logger().info(
-        f"Waiting for ports to be open and available on container {service.container_name}"
+    LOGGER.info(
+        "Waiting for ports to be open and available on container %s",
+        service.container_name,
     )
-    open_ports = None
+    delays = _get_wait_delays()
+    open_ports = docker_utils.get_open_ports(service.container_name)
     while not open_ports:
+        LOGGER.debug(
+            "Waiting for ports to be listed on container %s", service.container_name
+        )
+        time.sleep(next(delays))
         open_ports = docker_utils.get_open_ports(service.container_name)
-        if not open_ports:
-            log.get_logger().debug(
-                f"Waiting for ports to be listed on container {service.container_name}"
-            )
-            time.sleep(0.1)
-            continue
-        for container_port, host_port in open_ports.items():
-            log.get_logger().debug(
-                f"Waiting for port {host_port} (container port {container_port}) "
-                f"to be open for container {service.container_name}"
+
+    # Check every port that is not open yet on each attempt instead of waiting on them one at a time
+    delays = _get_wait_delays()
+    pending_ports = dict(open_ports)
+    while pending_ports:
+        for container_port, host_port in list(pending_ports.items()):
+            if docker_utils.is_port_open(host_port):
+                del pending_ports[container_port]
+        if pending_ports:
+            LOGGER.debug(
+                "Waiting for host port(s) %s to be open for container %s, sleeping...",
+                list(pending_ports.values()),
+                service.container_name,
             )
-            while not docker_utils.is_port_open(host_port):
-                log.get_logger().debug("Port is not open yet, sleeping...")
-                time.sleep(0.1)
+            time.sleep(next(delays))
     for port, path in service.wait_for_ports.items():
         docker_utils.check_port(service.container_name, open_ports[port], path)
 
 
 def _get_dev_projects(args: argparse.Namespace) -> List[Project]:
-    # Filter the projects by the list of passed in project names
-    return list(
-        project
-        for project in Project.find_all()
-        if project.name in args.dev_project_names
-    )
+    # Filter the projects by the list of passed in project names (keeping the config order)
+    dev_project_names = frozenset(args.dev_project_names)
+    return [
+        project for project in Project.find_all() if project.name in dev_project_names
+    ]
+
+
+def _get_docker_compose_base_commands(dev_projects: List[Project]) -> List[str]:
+    # Always use the same project name to allow containers to be started/stopped from any repo
+    commands = [
+        *docker_utils.get_docker_compose_command(),
+        "-p",
+        config.get_dc_project(),
+        "-f",
+        config.get_docker_compose_path(),
+    ]
+    for project in dev_projects:
+        commands.extend(("-f", os.path.join(project.path, config.DOCKER_COMPOSE_FILE)))
+    return commands
 
 
 def _run_docker_compose_with_projects(
@@ -60,22 +97,16 @@ def _run_docker_compose_with_projects(
     dev_projects: List[Project],
     docker_compose_args: List[str],
 ) -> int:
-    # Always use the same project name to allow containers to be started/stopped from any repo
-    commands = ["docker-compose", "-p", config.get_dc_project()]
-    commands.extend(["-f", config.get_docker_compose_path()])
-    for project in dev_projects:
-        commands.extend(["-f", os.path.join(project.path, config.DOCKER_COMPOSE_FILE)])
-    commands.extend(docker_compose_args)
+    commands = [*_get_docker_compose_base_commands(dev_projects), *docker_compose_args]
 
     # Only do this if we are bringing up the containers and the other arguments are all options
     if "up" in docker_compose_args and all(
         arg.startswith("-") or arg == "up" for arg in docker_compose_args
     ):
-        # Start core services
-        core_commands = []
-        core_commands.extend(commands)
-        if "--detach" not in core_commands and "-d" not in core_commands:
-            core_commands.append("--detach")
+        # Core and base services are always started detached, only add the flag if not already given
+        detach_args = []
+        if "--detach" not in docker_compose_args and "-d" not in docker_compose_args:
+            detach_args.append("--detach")
 
         # Get core service names
         core_services = list(
@@ -84,10 +115,14 @@ def _run_docker_compose_with_projects(
             if service.is_enabled(args)
         )
         core_service_names = list(service.dc_name for service in core_services)
-        core_commands.extend(core_service_names)
+        # Start core services
+        core_commands = [*commands, *detach_args, *core_service_names]
+        core_service_names_set = frozenset(core_service_names)
 
-        log.get_logger().info(
-            f'Starting {len(core_service_names)} core service(s) (detached) by calling {" ".join(core_commands)}'
+        LOGGER.info(
+            "Starting %d core service(s) (detached) by calling %s",
+            len(core_service_names),
+            " ".join(core_commands),
         )
         exit_code = call_commands(core_commands)
         if exit_code:
@@ -100,22 +135,21 @@ def _run_docker_compose_with_projects(
         # Start base services first if we are developing a service
         if dev_projects:
             # Bring up base containers first (detached to not fill up your screen with logs) only if have services
-            base_commands = []
-            base_commands.extend(commands)
-            if "--detach" not in base_commands and "-d" not in base_commands:
-                base_commands.append("--detach")
-
             # Only include services in this repo's docker compose file and are not core services
             base_services = docker_utils.read_services_from_dc(
                 config.get_docker_compose_path()
             )
             base_services = list(
-                filter(lambda service: service not in core_service_names, base_services)
+                service
+                for service in base_services
+                if service not in core_service_names_set
             )
-            base_commands.extend(base_services)
+            base_commands = [*commands, *detach_args, *base_services]
 
-            log.get_logger().info(
-                f'Starting {len(base_services)} base service(s) (detached) by calling {" ".join(base_commands)}'
+            LOGGER.info(
+                "Starting %d base service(s) (detached) by calling %s",
+                len(base_services),
+                " ".join(base_commands),
             )
             exit_code = subprocess.call(base_commands)
             if exit_code:
@@ -135,17 +169,21 @@ def _run_docker_compose_with_projects(
                 config.get_docker_compose_path()
             )
             all_services = list(
-                filter(lambda service: service not in core_service_names, all_services)
+                service
+                for service in all_services
+                if service not in core_service_names_set
             )
             commands.extend(all_services)
 
-    log.get_logger().info(f'Calling {" ".join(commands)}')
+    LOGGER.info("Calling %s", " ".join(commands))
     return call_commands(commands)
 
 
 def _run_docker_compose_internal(
     args: argparse.Namespace, docker_compose_args: List[str], no_network: bool = False
 ):
+    # Commands that never create containers (config, down, pull, rm, stop) pass no_network to avoid
+    # inspecting (or creating) the external docker network
     dev_projects = _get_dev_projects(args)
     docker_compose_utils.init_docker_compose(args, dev_projects, no_network=no_network)
     return _run_docker_compose_with_projects(args, dev_projects, docker_compose_args)
@@ -202,11 +240,13 @@ def run_dc_config(args: argparse.Namespace):
 
 def run_dc_down(args: argparse.Namespace):
     # Always add remove orphans flag since we can create orphans through enable/disable flags
-    return _run_docker_compose_internal(args, ["down", "--remove-orphans"])
+    return _run_docker_compose_internal(
+        args, ["down", "--remove-orphans"], no_network=True
+    )
 
 
 def run_dc_pull(args: argparse.Namespace):
-    return _run_docker_compose_internal(args, ["pull"])
+    return _run_docker_compose_internal(args, ["pull"], no_network=True)
 
 
 def run_dc_pull_config(args: argparse.Namespace):
@@ -219,15 +259,17 @@ def run_dc_pull_config(args: argparse.Namespace):
         raise KnownException(
             "Cannot pull configuration when using the real config service"
         )
-    return _run_docker_compose_internal(args, ["pull", config_service.dc_name])
+    return _run_docker_compose_internal(
+        args, ["pull", config_service.dc_name], no_network=True
+    )
 
 
 def run_dc_rm(args: argparse.Namespace):
-    return _run_docker_compose_internal(args, ["rm", "--force"])
+    return _run_docker_compose_internal(args, ["rm", "--force"], no_network=True)
 
 
 def run_dc_stop(args: argparse.Namespace):
-    return _run_docker_compose_internal(args, ["stop"])
+    return _run_docker_compose_internal(args, ["stop"], no_network=True)
 
 
 def run_dc_up(args: argparse.Namespace):
@@ -242,6 +284,58 @@ def run_dc_up_recreate(args: argparse.Namespace):
     return _run_docker_compose_internal(args, ["up", "--force-recreate"])
 
 
+def _get_git_workers(args: argparse.Namespace, project_count: int) -> int:
+    # Running one project at a time is useful when debugging problems with a single repository
+    if getattr(args, "no_parallel", False):
+        return 1
+    return min(_MAX_GIT_WORKERS, project_count)
+
+
+def _call_git_captured(commands: List[str], cwd: str) -> Tuple[int, str]:
+    """
+    Calls a git command, capturing stdout and stderr together so that output of commands running in parallel
+    can be printed separately for each project. Neither git nor ssh is allowed to prompt (for credentials, host
+    keys or passphrases) since the prompt would not be shown, the command fails instead.
+    :param commands: The git command and arguments
+    :param cwd: The directory to run the command in
+    :return: The exit code and the combined output of the command
+    """
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    if "GIT_SSH_COMMAND" not in env and "GIT_SSH" not in env:
+        # ssh reads its prompts from the terminal directly, parallel prompts would all wait on the same terminal
+        env["GIT_SSH_COMMAND"] = "ssh -o BatchMode=yes"
+    result = subprocess.run(
+        commands,
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        encoding="utf8",
+        errors="replace",
+        check=False,
+    )
+    return result.returncode, result.stdout
+
+
+def _print_output(output: str) -> None:
+    if output:
+        sys.stdout.write(output)
+        sys.stdout.flush()
+
+
+_REPO_STATUS_COMMAND = ["git", "status", "--short", "--branch", "--untracked-files=no"]
+
+
+def _get_repo_status(project: Project) -> str:
+    commands = list(_REPO_STATUS_COMMAND)
+    if sys.stdout.isatty():
+        # Output is captured, so git would no longer color it on its own
+        commands[1:1] = ["-c", "color.status=always"]
+    _, output = _call_git_captured(commands, project.path)
+    return output
+
+
 def get_repo_status(args: argparse.Namespace):
     if args.all_projects or not args.dev_project_names:
         projects = Project.find_all()
@@ -250,46 +344,72 @@ def get_repo_status(args: argparse.Namespace):
     if len(projects) == 0:
         raise KnownException("There are no projects available, please set projects")
 
-    log.get_logger().info(f"Getting the git status for {len(projects)} projects")
-
-    for project in projects:
-        log.get_logger().info(f"########### {project.name} ###########")
-        if not project.repository:
-            log.get_logger().info("No configured repository")
-            continue
+    LOGGER.info("Getting the git status for %d projects", len(projects))
+
+    workers = _get_git_workers(args, len(projects))
+    if workers == 1:
+        # Git writes directly to the terminal when running one project at a time
+        for project in projects:
+            LOGGER.info("########### %s ###########", project.name)
+            if not project.repository:
+                LOGGER.info("No configured repository")
+                continue
+            subprocess.call(_REPO_STATUS_COMMAND, cwd=project.path)
+        return
 
-        subprocess.call(
-            ["git", "status", "--short", "--branch", "--untracked-files=no"],
-            cwd=project.path,
-        )
+    # Get the status of all repos in parallel, but print them in order
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        status_futures = {
+            project.name: executor.submit(_get_repo_status, project)
+            for project in projects
+            if project.repository
+        }
+        for project in projects:
+            LOGGER.info("########### %s ###########", project.name)
+            if not project.repository:
+                LOGGER.info("No configured repository")
+                continue
+            _print_output(status_futures[project.name].result())
+
+
+def _get_git_remotes(project: Project) -> Set[str]:
+    # Listing the configured remotes is local, unlike probing each remote with ls-remote
+    result = subprocess.run(
+        ["git", "remote"],
+        cwd=project.path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding="utf8",
+        errors="replace",
+        check=False,
+    )
+    if result.returncode:
+        return set()
+    return set(result.stdout.split())
 
 
 def _handle_extra_remotes(extra_remotes: List[str], project: Project) -> None:
     if not extra_remotes:
         return
-    log.get_logger().debug("Adding any remotes specified if not already added")
+    LOGGER.debug("Adding any remotes specified if not already added")
     base_git_path = project.repository.split(":")[0]
+    existing_remotes = _get_git_remotes(project)
     for remote in extra_remotes:
         org = name = remote[0]
         if len(remote) == 2:
             # an optional name to be specified for the remote
             name = remote[1]
 
-        # check if remote exists
-        command = ["git", "ls-remote", "-q", "--exit-code", name]
-        # ignore stdout as the check can be misleading if this is the first time we are adding a repo
-        with open(os.devnull, "wb") as fnull:
-            exit_code = subprocess.call(
-                command, cwd=project.path, stdout=fnull, stderr=subprocess.STDOUT
-            )
-        if exit_code == 0:
-            log.get_logger().debug(
-                f"Remote {name} already exists in project {project.name}"
-            )
+        if name in existing_remotes:
+            LOGGER.debug("Remote %s already exists in project %s", name, project.name)
             continue
-        log.get_logger().info(
-            f"Trying to add remote {name} at "
-            f"{base_git_path}:{org}/{project.directory}.git in project {project.name}"
+        LOGGER.info(
+            "Trying to add remote %s at %s:%s/%s.git in project %s",
+            name,
+            base_git_path,
+            org,
+            project.directory,
+            project.name,
         )
         command = [
             "git",
@@ -301,22 +421,28 @@ def _handle_extra_remotes(extra_remotes: List[str], project: Project) -> None:
         exit_code = subprocess.call(command, cwd=project.path)
 
         if exit_code:
-            log.get_logger().warning(
-                f"There was a problem adding remote {remote} in project {project.name}"
+            LOGGER.warning(
+                "There was a problem adding remote %s in project %s",
+                remote,
+                project.name,
             )
+        else:
+            existing_remotes.add(name)
 
 
 def _handle_pre_commit(project: Project) -> None:
     if not project.pre_commit_config:
         return
+    # pylint: disable=import-outside-toplevel
+    from pre_commit.constants import CONFIG_FILE as PRE_COMMIT_CONFIG_FILE
 
     # If there is a pre-commit config file, then copy it to each repo, git add it, and install it
     pre_commit_config_path = config.get_pre_commit_config_path(
         project.pre_commit_config
     )
     if os.path.exists(pre_commit_config_path):
-        log.get_logger().debug(
-            f"Pre-commit config file {pre_commit_config_path} exists, installing"
+        LOGGER.debug(
+            "Pre-commit config file %s exists, installing", pre_commit_config_path
         )
         pre_commit_file_name = os.path.basename(pre_commit_config_path)
         shutil.copy(
@@ -326,17 +452,76 @@ def _handle_pre_commit(project: Project) -> None:
         subprocess.call(["git", "add", pre_commit_file_name], cwd=project.path)
         exit_code = subprocess.call(["pre-commit", "install"], cwd=project.path)
         if exit_code:
-            log.get_logger().warning(
-                f"Could not run pre-commit install for {project.name} ({project.path}), see errors above"
+            LOGGER.warning(
+                "Could not run pre-commit install for %s (%s), see errors above",
+                project.name,
+                project.path,
             )
     else:
-        log.get_logger().debug(
-            f"Pre-commit config file {pre_commit_config_path} does not exist, ignoring"
+        LOGGER.debug(
+            "Pre-commit config file %s does not exist, ignoring",
+            pre_commit_config_path,
+        )
+
+
+def _get_checkout_command(
+    project: Project, parent_dir: str
+) -> Tuple[str, List[str], str]:
+    if os.path.exists(project.path):
+        cwd = project.path
+        head_branch = subprocess.check_output(
+            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+            encoding="utf8",
+            cwd=cwd,
+        ).strip()
+        description = f"pulling changes for {head_branch}"
+        commands = ["git", "pull", "upstream", head_branch]
+    else:
+        description = "cloning"
+        commands = ["git", "clone", "--origin", "upstream", project.repository]
+        cwd = parent_dir
+    return description, commands, cwd
+
+
+def _clone_or_update_project(project: Project, parent_dir: str) -> Tuple[str, int, str]:
+    description, commands, cwd = _get_checkout_command(project, parent_dir)
+    exit_code, output = _call_git_captured(commands, cwd)
+    return description, exit_code, output
+
+
+def _clone_or_update_projects(
+    projects: List[Project], parent_dir: str, workers: int
+) -> Iterator[Tuple[Project, int]]:
+    """
+    Clones or updates each project, logging the output of each project together.
+    :param projects: The projects to clone or update, in the order that output is logged
+    :param parent_dir: The directory that new projects are cloned into
+    :param workers: The number of projects to run git for at a time
+    :return: An iterator of each project with the git exit code, in order
+    """
+    if workers == 1:
+        # Git writes directly to the terminal (and may prompt) when running one project at a time
+        for project in projects:
+            description, commands, cwd = _get_checkout_command(project, parent_dir)
+            LOGGER.info("########### %s (%s) ###########", project.name, description)
+            yield project, subprocess.call(commands, cwd=cwd)
+        return
+
+    # Clone/pull all repos in parallel since that is mostly waiting on the network, then handle the
+    # results in order so that output for each project is kept together
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        checkout_futures = list(
+            executor.submit(_clone_or_update_project, project, parent_dir)
+            for project in projects
         )
+        for project, checkout_future in zip(projects, checkout_futures):
+            description, exit_code, output = checkout_future.result()
+            LOGGER.info("########### %s (%s) ###########", project.name, description)
+            _print_output(output)
+            yield project, exit_code
 
 
 def run_checkout(args: argparse.Namespace):
-    # pylint: disable=too-many-branches
     if args.all_projects or not args.dev_project_names:
         projects = Project.find_all()
     else:
@@ -345,36 +530,27 @@ def run_checkout(args: argparse.Namespace):
         raise KnownException("There are no projects available, please set projects")
 
     parent_dir = os.path.realpath(os.path.join(config.get_base_dir(), ".."))
-    log.get_logger().info(f"Checking out {len(projects)} projects to {parent_dir}")
+    LOGGER.info("Checking out %d projects to %s", len(projects), parent_dir)
     result = os.EX_OK
+
+    # Skip projects without a repository
     for project in projects:
-        # Skip projects without a repository
         if not project.repository:
-            log.get_logger().debug(
-                f"Skipping project {project.name} since it does not have a configured repository"
+            LOGGER.debug(
+                "Skipping project %s since it does not have a configured repository",
+                project.name,
             )
-            continue
-
-        if os.path.exists(project.path):
-            cwd = project.path
-            head_branch = subprocess.check_output(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                encoding="utf8",
-                cwd=cwd,
-            ).strip()
-            log.get_logger().info(
-                f"########### {project.name} (pulling changes for {head_branch}) ###########"
-            )
-            commands = ["git", "pull", "upstream", head_branch]
-        else:
-            log.get_logger().info(f"########### {project.name} (cloning) ###########")
-            commands = ["git", "clone", "--origin", "upstream", project.repository]
-            cwd = parent_dir
-        exit_code = subprocess.call(commands, cwd=cwd)
+    projects = list(project for project in projects if project.repository)
+    if not projects:
+        return result
 
+    workers = _get_git_workers(args, len(projects))
+    for project, exit_code in _clone_or_update_projects(projects, parent_dir, workers):
         if exit_code:
-            log.get_logger().warning(
-                f"Could not clone or update {project.name} ({project.path}), see errors above"
+            LOGGER.warning(
+                "Could not clone or update %s (%s), see errors above",
+                project.name,
+                project.path,
             )
             result = exit_code
         else:
@@ -8,12 +8,9 @@ with the terms of the Adobe license agreement accompanying it.
 
 import os
 from functools import lru_cache
-from typing import Any, Dict, Iterable, List, Optional, Union
-
-import yaml
-
-from pre_commit.constants import CONFIG_FILE as PRE_COMMIT_CONFIG_FILE
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
+from . import yaml_utils
 from .exceptions import KnownException
 
 
@@ -23,23 +20,68 @@ DOCKER_COMPOSE_TEMPLATE = "docker-compose-template.yml"
 DOCKER_COMPOSE_FILE = "docker-compose.yml"
 ENV_FILE = "docker-compose.env"
 
+# Keys of the docker-compose config that only configure this tool and are not passed through to docker compose
+_DC_CONFIG_ONLY_KEYS = frozenset(
+    (
+        "build-args",
+        "tags",
+        "registries-by-tag",
+        "registry",
+        "project",
+        "network",
+    )
+)
+
 # Global vars
 _BASE_DIR = os.path.dirname(__file__)
+_BASE_DIR_NAME = os.path.basename(_BASE_DIR)
+# Functions that clear values derived from the config in other modules (e.g. the data module)
+_RESET_HOOKS: List[Callable[[], None]] = []
+
+
+def register_reset_hook(hook: Callable[[], None]) -> None:
+    """
+    Registers a function that is called whenever the config is reset by initialize, used by modules that cache
+    values derived from the config.
+    """
+    _RESET_HOOKS.append(hook)
 
 
-def initialize(base_dir: str) -> None:
+def initialize(base_dir: str, force: bool = False) -> None:
     """
-    Sets the base dir for all further operations, this should be called first
+    Sets the base dir for all further operations, this should be called first. Calling this again with the same
+    base dir does nothing, unless forced.
+    :param base_dir: The control project directory
+    :param force: Reset all cached config values (and everything derived from them) even if the base dir is the
+                  same, e.g. after the config file changed
     """
     # pylint: disable=global-statement
-    global _BASE_DIR
+    global _BASE_DIR, _BASE_DIR_NAME
+    if base_dir == _BASE_DIR and not force:
+        return
     _BASE_DIR = base_dir
+    _BASE_DIR_NAME = os.path.basename(os.path.abspath(base_dir))
+
+    # Cached values are all relative to the base dir and no longer apply
+    get_env_file_path.cache_clear()
+    get_pre_commit_config_path.cache_clear()
+    get_docker_compose_path.cache_clear()
+    _get_config.cache_clear()
+    for hook in _RESET_HOOKS:
+        hook()
 
 
 def get_base_dir() -> str:
     return _BASE_DIR
 
 
+def get_base_dir_name() -> str:
+    """
+    Gets the name of the base directory (the control project directory), without the rest of the path.
+    """
+    return _BASE_DIR_NAME
+
+
 # The following methods are cached so that we only retrieve/validate them once (config cannot be changed mid-run)
 @lru_cache()
 def get_env_file_path() -> str:
@@ -49,6 +91,10 @@ def get_env_file_path() -> str:
 @lru_cache()
 def get_pre_commit_config_path(project_pre_commit_config: Union[str, bool]) -> str:
     if isinstance(project_pre_commit_config, bool):
+        # Imported here since pre_commit looks up its package version on import, which is only needed at checkout
+        # pylint: disable=import-outside-toplevel
+        from pre_commit.constants import CONFIG_FILE as PRE_COMMIT_CONFIG_FILE
+
         return os.path.join(_BASE_DIR, str(PRE_COMMIT_CONFIG_FILE))
     return os.path.join(_BASE_DIR, project_pre_commit_config)
 
@@ -65,9 +111,10 @@ def _get_config() -> Dict[str, Any]:
         raise KnownException(
             f"Config file {config_path} does not exist, please copy and modify example"
         )
-    with open(config_path, "r", encoding="utf8") as config_file:
+    # Read as bytes, the loader detects the encoding itself and libyaml can parse the buffer directly
+    with open(config_path, "rb") as config_file:
         try:
-            config = yaml.safe_load(config_file)
+            config = yaml_utils.safe_load(config_file)
         except Exception:
             # pylint: disable=raise-missing-from
             raise KnownException(
@@ -183,16 +230,8 @@ def get_registry(tag: str) -> str:
 
 def get_dc_data() -> dict:
     dc_config = _get_config()["docker-compose"]
-    data = {}
-    for key, value in dc_config.items():
-        if key in (
-            "build-args",
-            "tags",
-            "registries-by-tag",
-            "registry",
-            "project",
-            "network",
-        ):
-            continue
-        data[key] = value
-    return data
+    return {
+        key: value
+        for key, value in dc_config.items()
+        if key not in _DC_CONFIG_ONLY_KEYS
+    }
@@ -7,40 +7,60 @@ with the terms of the Adobe license agreement accompanying it.
 """
 import argparse
 import os
-from functools import lru_cache
-from typing import Any, Dict, List, Optional, Union
+from functools import cached_property, lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from .config import (
     get_base_dir,
     get_project_config,
     get_service_prefix,
     get_target_service,
+    register_reset_hook,
 )
 from .exceptions import KnownException
 
 
+# Keys of a service config that only configure this tool and are not passed through to docker compose
+_SERVICE_CONFIG_ONLY_KEYS = frozenset(
+    (
+        "name",
+        "core",
+        "enable",
+        "disable",
+        "dynamic-options",
+        "wait-for-ports",
+    )
+)
+
+
 class Service:
     def __init__(self, project_name: str, data: dict):
         self.project_name = project_name
         self.data = data
 
+    def _clear_memos(self) -> None:
+        # Cached properties depend on the config prefixes, they are cleared with the caches by clear_caches
+        for name in ("container_name", "_base_dc_data"):
+            self.__dict__.pop(name, None)
+
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
         return self.name == other.name and self.project_name == other.project_name
 
     def __hash__(self):
-        return hash(f"{self.project_name}{self.name}")
+        return hash((self.project_name, self.name))
 
     @property
     def name(self):
         return self.data.get("name")
 
-    @property
+    @cached_property
     def container_name(self):
         """
         The actual container name.
         """
+        # Used for every service when generating docker compose files, so only look up the prefix once
         prefix = get_service_prefix("core" if self.core else "service")
         return f'{prefix}{self.data.get("name")}'
 
@@ -73,28 +93,36 @@ class Service:
     def wait_for_ports(self) -> Dict[int, str]:
         return self.data.get("wait-for-ports", {})
 
-    def get_dc_data(self, registry: str, tag: str) -> Dict[str, Any]:
-        data = {
+    @cached_property
+    def _base_dc_data(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        # Only the image depends on the registry and tag, so the rest of the data is only filtered once
+        dc_data = {
             # Always add container name
             "container_name": self.container_name,
         }
+        image_path = None
         for key, value in self.data.items():
             # Ignore some keys
-            if key in (
-                "name",
-                "core",
-                "enable",
-                "disable",
-                "dynamic-options",
-                "wait-for-ports",
-            ):
+            if key in _SERVICE_CONFIG_ONLY_KEYS:
                 continue
             if key == "image_path":
-                # Interpolate image path
-                data["image"] = f"{registry}{value}:{tag}"
+                # Interpolated by get_dc_data, keep the position of the image in the data
+                image_path = value
+                dc_data["image"] = None
             else:
                 # All other values are a pass-through to docker-compose
-                data[key] = value
+                if key == "image":
+                    # The last of image and image_path wins
+                    image_path = None
+                dc_data[key] = value
+        return dc_data, image_path
+
+    def get_dc_data(self, registry: str, tag: str) -> Dict[str, Any]:
+        base_dc_data, image_path = self._base_dc_data
+        data = base_dc_data.copy()
+        if image_path is not None:
+            # Interpolate image path
+            data["image"] = f"{registry}{image_path}:{tag}"
         return data
 
     def _get_flag_name(self, flag_value: Union[str, bool], prefix: str) -> str:
@@ -130,25 +158,32 @@ class Service:
         return is_enabled or is_not_disabled
 
     @classmethod
+    @lru_cache()
     def find_all(cls, core=None) -> List["Service"]:
-        services = []
-        for project in Project.find_all():
-            if core is None:
-                services.extend(project.services)
-            else:
-                services.extend(
-                    service for service in project.services if core == service.core
-                )
-        return services
+        if core is None:
+            return [
+                service
+                for project in Project.find_all()
+                for service in project.services
+            ]
+        # Filter the cached list of all services instead of going through every project again
+        return [service for service in cls.find_all() if core == service.core]
 
     @classmethod
-    def find_one(cls, name: str) -> Optional["Service"]:
+    @lru_cache()
+    def _find_all_by_name(cls) -> Dict[str, "Service"]:
+        services_by_name = {}
         for service in cls.find_all():
-            if service.name == name:
-                return service
-        return None
+            # Keep the first service if multiple are named the same, as a scan of all services would
+            services_by_name.setdefault(service.name, service)
+        return services_by_name
+
+    @classmethod
+    def find_one(cls, name: str) -> Optional["Service"]:
+        return cls._find_all_by_name().get(name)
 
     @classmethod
+    @lru_cache()
     def find_config(cls) -> Optional["Service"]:
         target_service = get_target_service("config", optional=True)
         if not target_service:
@@ -156,22 +191,14 @@ class Service:
         return cls.find_one(target_service)
 
     @classmethod
+    @lru_cache()
     def find_has_enable_flag(cls) -> List["Service"]:
-        services = []
-        for project in Project.find_all():
-            services.extend(
-                service for service in project.services if service.enable_flag
-            )
-        return services
+        return [service for service in cls.find_all() if service.enable_flag]
 
     @classmethod
+    @lru_cache()
     def find_has_disable_flag(cls) -> List["Service"]:
-        services = []
-        for project in Project.find_all():
-            services.extend(
-                service for service in project.services if service.disable_flag
-            )
-        return services
+        return [service for service in cls.find_all() if service.disable_flag]
 
 
 class Project:
@@ -179,8 +206,15 @@ class Project:
         self.name = name
         self.data = data
 
-    @property
+    def _clear_memos(self) -> None:
+        # The path depends on the base dir, it is cleared with the caches by clear_caches
+        self.__dict__.pop("path", None)
+        for service in self.__dict__.get("services", ()):
+            service._clear_memos()
+
+    @cached_property
     def services(self) -> List[Service]:
+        # Projects are cached by find_all, so each service is only created once until the caches are cleared
         return list(
             Service(self.name, service) for service in self.data.get("services", [])
         )
@@ -197,12 +231,13 @@ class Project:
     def pre_commit_config(self) -> Union[str, bool]:
         return self.data.get("pre_commit_config", False)
 
-    @property
+    @cached_property
     def path(self) -> str:
         if not self.directory:
             raise KnownException(
                 f"Project {self.name} does not have a directory, cannot get a path for it"
             )
+        # Resolved once since realpath stats every path component
         return os.path.realpath(os.path.join(get_base_dir(), "..", self.directory))
 
     @classmethod
@@ -211,9 +246,52 @@ class Project:
         project_config = get_project_config()
         return list(Project(name, data) for name, data in project_config.items())
 
+    @classmethod
+    @lru_cache()
+    def _find_all_by_name(cls) -> Dict[str, "Project"]:
+        return {project.name: project for project in cls.find_all()}
+
     @classmethod
     def find_one(cls, name: str) -> Optional["Project"]:
+        return cls._find_all_by_name().get(name)
+
+    @classmethod
+    @lru_cache()
+    def _find_all_by_directory(cls) -> Dict[str, List["Project"]]:
+        projects_by_directory: Dict[str, List["Project"]] = {}
         for project in cls.find_all():
-            if project.name == name:
-                return project
-        return None
+            if project.directory:
+                projects_by_directory.setdefault(project.directory, []).append(project)
+        return projects_by_directory
+
+    @classmethod
+    def find_all_by_directory(cls, directory: str) -> List["Project"]:
+        """
+        Finds the projects that are checked out to the given directory name.
+        :param directory: The directory name (not path) of the projects
+        :return: The projects in config order, empty if no project uses the directory
+        """
+        return cls._find_all_by_directory().get(directory, [])
+
+
+def clear_caches() -> None:
+    """
+    Clears all cached projects and services, they are loaded again from the config on the next lookup.
+    """
+    # pylint: disable=protected-access
+    # Instances may still be referenced by callers, so clear their memoized values before dropping them
+    if Project.find_all.cache_info().currsize:
+        for project in Project.find_all():
+            project._clear_memos()
+    Service.find_all.cache_clear()
+    Service._find_all_by_name.cache_clear()
+    Service.find_config.cache_clear()
+    Service.find_has_enable_flag.cache_clear()
+    Service.find_has_disable_flag.cache_clear()
+    Project.find_all.cache_clear()
+    Project._find_all_by_name.cache_clear()
+    Project._find_all_by_directory.cache_clear()
+
+
+# The cached projects and services are derived from the config of the base dir
+register_reset_hook(clear_caches)
@@ -8,153 +8,271 @@ with the terms of the Adobe license agreement accompanying it.
 
 import argparse
 import os
-from typing import List
+import shutil
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
 
-import jinja2
-import yaml
-
-from . import config, docker_utils, log
+from . import config, docker_utils, yaml_utils
 from .data import Project, Service
 from .exceptions import KnownException
+from .log import LOGGER
+
+if TYPE_CHECKING:
+    import jinja2
+
+
+# The maximum number of docker compose templates to render at the same time
+_MAX_RENDER_WORKERS = 8
+
 
+def _get_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
 
-def _check_required_options():
-    log.get_logger().info(f"Validating config file ({config.ENV_FILE})")
-    if not os.path.exists(config.get_env_file_path()):
+
+# Read once on import, changing the umask to read it would affect files created by other threads
+_UMASK = _get_umask()
+
+
+def _write_file(
+    path: str, contents: str, current_contents: Optional[str] = None
+) -> None:
+    """
+    Writes a generated file only if the contents changed. The file is written next to the destination first and
+    then renamed over it, so an interrupted write never leaves a partial file behind.
+    :param path: The path to write
+    :param contents: The new contents of the file
+    :param current_contents: The current contents of the file if already known, otherwise the file is read
+    """
+    if current_contents is None:
+        try:
+            with open(path, "r", encoding="utf8") as fobj:
+                current_contents = fobj.read()
+        except FileNotFoundError:
+            pass
+    if contents == current_contents:
+        return
+    # Replace the file a symlink points to rather than the link itself
+    path = os.path.realpath(path)
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf8") as fobj:
+            fobj.write(contents)
+        # Temporary files are only readable by the owner, keep the mode of the replaced file (the env file may
+        # be restricted since it contains credentials) or use the default mode for new files
+        try:
+            shutil.copymode(path, temp_path)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _read_env_file() -> str:
+    try:
+        with open(config.get_env_file_path(), "r", encoding="utf8") as fobj:
+            return fobj.read()
+    except FileNotFoundError as exc:
         raise KnownException(
             f"Please create {config.get_env_file_path()} containing env vars for project config, "
             f"this will be used to configure each project. The {config.ENV_FILE}.example "
             "file may be used as a template"
+        ) from exc
+
+
+def _check_required_options(contents: str) -> None:
+    LOGGER.info("Validating config file (%s)", config.ENV_FILE)
+    # Collect the defined options in one pass, so options are not matched in comments, values or other names
+    defined_options = set()
+    for line in contents.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            # Options without a value are passed through from the environment by docker compose
+            defined_options.add(line.partition("=")[0].strip())
+    missing_options = [
+        option
+        for option in config.get_required_options()
+        if option not in defined_options
+    ]
+    if missing_options:
+        raise KnownException(
+            f"The {config.get_env_file_path()} file must include the "
+            f'{", ".join(missing_options)} option{"s" if len(missing_options) > 1 else ""}'
         )
-    with open(config.get_env_file_path(), "r", encoding="utf8") as fobj:
-        contents = fobj.read()
-    required_options = config.get_required_options()
-    for option in required_options:
-        if option not in contents:
-            raise KnownException(
-                f"The {config.get_env_file_path()} file must include the {option} option"
-            )
 
 
 def _check_project_directories(projects: List[Project]) -> None:
     if len(projects) == 0:
-        log.get_logger().debug("No projects specified, not validating directories")
+        LOGGER.debug("No projects specified, not validating directories")
         return
-    log.get_logger().info(
-        f"Validating directories are present for {len(projects)} projects(s)"
-    )
+    LOGGER.info("Validating directories are present for %d projects(s)", len(projects))
     for project in projects:
-        if not os.path.exists(project.path) or not os.path.isdir(project.path):
+        # isdir is also false if the path does not exist, so there is no need to stat twice
+        if not os.path.isdir(project.path):
             raise KnownException(
                 f'No directory found for the "{project.name}" project at {project.path}, '
                 "please check the repository"
             )
 
 
-def _set_dynamic_options(args: argparse.Namespace) -> None:
+def _get_enabled_services(args: argparse.Namespace) -> Dict[str, bool]:
+    return {service.name: service.is_enabled(args) for service in Service.find_all()}
+
+
+def _set_dynamic_options(
+    enabled_services: Dict[str, bool], env_file_contents: str
+) -> None:
     # pylint: disable=too-many-branches
 
-    with open(config.get_env_file_path(), "r", encoding="utf8") as fobj:
-        env_file_contents = fobj.read()
     new_contents = []
     lines_changed = False
 
-    enabled_status_by_service = {}
-    services_by_dynamic_option = {}
-    for service in Service.find_all():
-        enabled_status_by_service[service.name] = service.is_enabled(args)
-        for option in service.dynamic_options.keys():
-            services_by_dynamic_option[option] = service
-    dynamic_options_seen = {}
-    for option in services_by_dynamic_option:
-        dynamic_options_seen[option] = False
-
-    for line in env_file_contents.splitlines():
-        option_considered = False
-        for option, service in services_by_dynamic_option.items():
-            if not line.startswith(f"{option}="):
-                continue
-            option_considered = True
-            dynamic_options_seen[option] = True
-            if enabled_status_by_service.get(service.name, True):
-                value = service.dynamic_options[option].get("enabled")
-            else:
-                value = service.dynamic_options[option].get("disabled")
+    # Dict order (config order) is kept so that missing options are appended consistently
+    services_by_dynamic_option: Dict[str, Service] = {
+        option: service
+        for service in Service.find_all()
+        for option in service.dynamic_options
+    }
+    dynamic_options_seen: Set[str] = set()
 
-            if value:
-                new_line = f"{option}={value}"
-                if line != new_line:
-                    log.get_logger().info(
-                        f"Replacing dynamic option for {option} in {config.ENV_FILE} with {value}"
-                    )
-                    lines_changed = True
-                else:
-                    log.get_logger().info(
-                        f"Keeping existing dynamic option for {option} in {config.ENV_FILE}"
-                    )
-                new_contents.append(new_line)
-            else:
-                log.get_logger().info(
-                    f"Removing dynamic option for {option} in {config.ENV_FILE}"
-                )
-                lines_changed = True
+    # Line endings are kept so that untouched lines are written back as they were read
+    for line in env_file_contents.splitlines(keepends=True):
+        # Look up the option by the name before the first "=" instead of checking every dynamic option
+        option, separator, _ = line.partition("=")
+        service = services_by_dynamic_option.get(option) if separator else None
 
         # If no dynamic options are in the line, append it
-        if not option_considered:
+        if not service:
             new_contents.append(line)
+            continue
+
+        dynamic_options_seen.add(option)
+        if enabled_services.get(service.name, True):
+            value = service.dynamic_options[option].get("enabled")
+        else:
+            value = service.dynamic_options[option].get("disabled")
+
+        if value:
+            new_line = f"{option}={value}\n"
+            if line.rstrip("\r\n") != new_line[:-1]:
+                LOGGER.info(
+                    "Replacing dynamic option for %s in %s with %s",
+                    option,
+                    config.ENV_FILE,
+                    value,
+                )
+                lines_changed = True
+            else:
+                LOGGER.info(
+                    "Keeping existing dynamic option for %s in %s",
+                    option,
+                    config.ENV_FILE,
+                )
+            new_contents.append(new_line)
+        else:
+            LOGGER.info("Removing dynamic option for %s in %s", option, config.ENV_FILE)
+            lines_changed = True
 
     for option, service in services_by_dynamic_option.items():
-        if not dynamic_options_seen[option]:
-            if enabled_status_by_service.get(service.name, True):
+        if option not in dynamic_options_seen:
+            if enabled_services.get(service.name, True):
                 value = service.dynamic_options[option].get("enabled")
             else:
                 value = service.dynamic_options[option].get("disabled")
             if value:
-                log.get_logger().info(
-                    f"Adding dynamic option for {option} in {config.ENV_FILE} with value {value}"
+                LOGGER.info(
+                    "Adding dynamic option for %s in %s with value %s",
+                    option,
+                    config.ENV_FILE,
+                    value,
                 )
-                new_contents.append(f"{option}={value}")
+                # The last line of the file may not end with a newline
+                if new_contents and not new_contents[-1].endswith("\n"):
+                    new_contents[-1] += "\n"
+                new_contents.append(f"{option}={value}\n")
                 lines_changed = True
 
     if lines_changed:
-        with open(config.get_env_file_path(), "w", encoding="utf8") as fobj:
-            fobj.write("\n".join(new_contents))
+        _write_file(
+            config.get_env_file_path(),
+            "".join(new_contents),
+            current_contents=env_file_contents,
+        )
 
 
 def _link_config(projects: List[Project]):
     if len(projects) == 0:
-        log.get_logger().debug(f"No projects specified, not linking {config.ENV_FILE}")
+        LOGGER.debug("No projects specified, not linking %s", config.ENV_FILE)
         return
-    log.get_logger().info(
-        f"Linking base {config.ENV_FILE} to {len(projects)} projects(s)"
-    )
+    LOGGER.info("Linking base %s to %d projects(s)", config.ENV_FILE, len(projects))
     for project in projects:
         env_project_path = os.path.join(project.path, config.ENV_FILE)
-        if not os.path.exists(env_project_path):
+        try:
+            env_project_mode = os.lstat(env_project_path).st_mode
+        except FileNotFoundError:
             os.symlink(config.get_env_file_path(), env_project_path)
-        elif os.path.islink(env_project_path):
-            # nothing to do if it already exists
-            pass
         else:
-            os.remove(env_project_path)
-            os.symlink(config.get_env_file_path(), env_project_path)
-        log.get_logger().debug(f"Linked in {project.path}")
+            if stat.S_ISLNK(env_project_mode) and os.path.exists(env_project_path):
+                # nothing to do if it already exists
+                pass
+            else:
+                # Replace regular files and dangling links (symlink would fail with FileExistsError)
+                os.remove(env_project_path)
+                os.symlink(config.get_env_file_path(), env_project_path)
+        LOGGER.debug("Linked in %s", project.path)
+
+
+@lru_cache()
+def _get_template_bytecode_cache() -> "jinja2.BytecodeCache":
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    import jinja2
+
+    # Every run of the control script is a new process, keeping the compiled templates in the (per user)
+    # temporary directory skips parsing them again. Entries are keyed by the template source checksum.
+    return jinja2.FileSystemBytecodeCache()
+
+
+@lru_cache()
+def _get_template_environment(project_dir: str) -> "jinja2.Environment":
+    # Only imported when templates are rendered, commands like checkout and repo-status never need it
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    import jinja2
+
+    # Environments keep their compiled templates, so only create one per project directory
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(project_dir),
+        bytecode_cache=_get_template_bytecode_cache(),
+        # Templates are not changed during a run, do not check them again when they are reused
+        auto_reload=False,
+    )
 
 
 def _render_docker_compose_file(project_dir, template_config):
-    if not os.path.exists(os.path.join(project_dir, config.DOCKER_COMPOSE_TEMPLATE)):
-        log.get_logger().debug(
-            f"No {config.DOCKER_COMPOSE_TEMPLATE} detected in the {project_dir} directory, skipping generation"
-        )
-        return
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    import jinja2
+
     try:
-        env = jinja2.Environment(loader=jinja2.FileSystemLoader(project_dir))
-        template = env.get_template(config.DOCKER_COMPOSE_TEMPLATE)
+        env = _get_template_environment(project_dir)
+        # The loader looks for the template anyway, so there is no need to check that it exists first
+        try:
+            template = env.get_template(config.DOCKER_COMPOSE_TEMPLATE)
+        except jinja2.exceptions.TemplateNotFound:
+            LOGGER.debug(
+                "No %s detected in the %s directory, skipping generation",
+                config.DOCKER_COMPOSE_TEMPLATE,
+                project_dir,
+            )
+            return
         output = template.render(**template_config)
-        with open(
-            os.path.join(project_dir, config.DOCKER_COMPOSE_FILE), "w", encoding="utf8"
-        ) as fobj:
-            fobj.write(output)
+        _write_file(os.path.join(project_dir, config.DOCKER_COMPOSE_FILE), output)
     except jinja2.exceptions.TemplateSyntaxError as exc:
         # pylint: disable=raise-missing-from
         raise KnownException(
@@ -163,60 +281,74 @@ def _render_docker_compose_file(project_dir, template_config):
 
 
 def _generate_docker_compose(
-    args: argparse.Namespace, dev_projects: List[Project], tag: str
+    enabled_services: Dict[str, bool], dev_projects: List[Project], tag: str
 ):
     registry = config.get_registry(tag)
-    log.get_logger().info(
-        f'Generating docker-compose.yml with {len(dev_projects)} project(s) and tag "{tag}"'
+    network = config.get_dc_network()
+    env_file = f"./{config.ENV_FILE}"
+    LOGGER.info(
+        'Generating docker-compose.yml with %d project(s) and tag "%s"',
+        len(dev_projects),
+        tag,
     )
 
     services = {}
     dev_project_names = list(project.name for project in dev_projects)
+    dev_project_names_set = frozenset(dev_project_names)
     projects = Project.find_all()
 
-    enabled_services = {}
-    for project in projects:
-        for service in project.services:
-            enabled_services[service.name] = service.is_enabled(args)
-
     for project in projects:
-        if project.name in dev_project_names:
+        if project.name in dev_project_names_set:
             continue
         for service in project.services:
             if not enabled_services.get(service.name):
                 continue
             data = service.get_dc_data(registry, tag)
             # Add env file and network dynamically
-            if "env_file" not in data:
-                data["env_file"] = [f"./{config.ENV_FILE}"]
-            if "networks" not in data:
-                data["networks"] = [config.get_dc_network()]
+            data.setdefault("env_file", [env_file])
+            data.setdefault("networks", [network])
             services[service.dc_name] = data
 
     # Write out base docker compose
     docker_compose_data = {
         "networks": {
-            config.get_dc_network(): {
+            network: {
                 "external": True,
             },
         },
         "services": services,
     }
     docker_compose_data.update(config.get_dc_data())
-    with open(config.get_docker_compose_path(), "w", encoding="utf8") as fobj:
-        yaml.safe_dump(docker_compose_data, fobj)
+    _write_file(
+        config.get_docker_compose_path(), yaml_utils.safe_dump(docker_compose_data)
+    )
 
     template_config = {
         "dev_project_names": dev_project_names,
         "enabled_services": enabled_services,
         "tag": tag,
         "registry": registry,
-        "network": config.get_dc_network(),
+        "network": network,
         "core_prefix": config.get_service_prefix("core"),
         "service_prefix": config.get_service_prefix(),
     }
-    for project in dev_projects:
-        _render_docker_compose_file(project.path, template_config)
+    if len(dev_projects) <= 1:
+        for project in dev_projects:
+            _render_docker_compose_file(project.path, template_config)
+        return
+    # Render the templates in parallel since reading and writing files dominates on slow (bind mounted) file
+    # systems, the results are consumed in order so that the first failure is raised
+    with ThreadPoolExecutor(
+        max_workers=min(_MAX_RENDER_WORKERS, len(dev_projects))
+    ) as executor:
+        list(
+            executor.map(
+                lambda project: _render_docker_compose_file(
+                    project.path, template_config
+                ),
+                dev_projects,
+            )
+        )
 
 
 def init_docker_compose(
@@ -225,7 +357,11 @@ def init_docker_compose(
     if not no_network:
         docker_utils.check_docker_network()
     _check_project_directories(dev_projects)
-    _check_required_options()
-    _set_dynamic_options(args)
+    # Read the env file once and share the contents between validation and updates
+    env_file_contents = _read_env_file()
+    _check_required_options(env_file_contents)
+    # Determine the enabled status of every service once for both the env file and templates
+    enabled_services = _get_enabled_services(args)
+    _set_dynamic_options(enabled_services, env_file_contents)
     _link_config(dev_projects)
-    _generate_docker_compose(args, dev_projects, args.tag)
+    _generate_docker_compose(enabled_services, dev_projects, args.tag)
@@ -7,33 +7,80 @@ with the terms of the Adobe license agreement accompanying it.
 """
 
 import contextlib
+import logging
+import os
 import re
+import shlex
+import shutil
 import socket
 import subprocess
 import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Tuple
 
-import requests
 import yaml
 
-from . import config, log
+from . import config, yaml_utils
+from .log import LOGGER
 
+if TYPE_CHECKING:
+    import requests
 
-def check_docker_network():
-    log.get_logger().debug(f"Checking for docker network {config.get_dc_network()}")
+_CHECK_PORT_INITIAL_DELAY = 0.1
+_CHECK_PORT_MAX_DELAY = 2.0
+# Seconds between info logs while waiting, other attempts are only logged at the debug level
+_CHECK_PORT_LOG_INTERVAL = 3.0
+# Seconds to wait for a response from a service, some services are slow to answer their first request
+_CHECK_PORT_TIMEOUT = 30
+# Matches the "docker port" output lines, which are matched as bytes so that they do not need to be decoded
+_PORT_PATTERN = re.compile(rb"^(\d+)/tcp -> 0\.0\.0\.0:(\d+)$")
+_YAML_MERGE_TAG = "tag:yaml.org,2002:merge"
+_DOCKER_COMPOSE_ENV_VAR = "PYDC_CONTROL_DOCKER_COMPOSE"
+
+
+@lru_cache()
+def get_docker_compose_command() -> Tuple[str, ...]:
+    """
+    Gets the command used to call docker compose. This may be set explicitly with the
+    PYDC_CONTROL_DOCKER_COMPOSE environment variable (for example "docker compose"). Otherwise the
+    standalone docker-compose is used if it is installed, since the docker compose plugin names
+    containers differently, and the plugin is only used as a fallback.
+    :return: The command and any arguments needed for docker compose
+    """
+    command = os.environ.get(_DOCKER_COMPOSE_ENV_VAR)
+    if command:
+        return tuple(shlex.split(command))
+    if shutil.which("docker-compose") is not None:
+        return ("docker-compose",)
+    LOGGER.debug("docker-compose is not installed, using the docker compose plugin")
+    return "docker", "compose"
+
+
+@lru_cache()
+def _check_docker_network(network: str) -> None:
+    LOGGER.debug("Checking for docker network %s", network)
     exit_code = subprocess.call(
-        ["docker", "network", "inspect", config.get_dc_network()],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        ["docker", "network", "inspect", network],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
     )
     if exit_code:
-        log.get_logger().info(f"Creating docker network {config.get_dc_network()}")
+        LOGGER.info("Creating docker network %s", network)
         subprocess.check_call(
-            ["docker", "network", "create", config.get_dc_network()],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            ["docker", "network", "create", network],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
         )
 
 
+def check_docker_network():
+    """
+    Creates the docker network if it does not exist. The network is only checked once per process, since
+    control scripts may run several docker compose commands in a row.
+    """
+    _check_docker_network(config.get_dc_network())
+
+
 def get_open_ports(container_name):
     """
     Retrieves the open ports on a container.
@@ -44,16 +91,15 @@ def get_open_ports(container_name):
         lines = subprocess.check_output(["docker", "port", container_name]).splitlines()
         ports = {}
         for line in lines:
-            match = re.match(
-                r"^(\d+)/tcp -> 0.0.0.0:(\d+)$", line.strip().decode("utf-8")
-            )
+            match = _PORT_PATTERN.match(line.strip())
             if not match:
                 continue
             ports[int(match.group(1))] = int(match.group(2))
         return ports
     except subprocess.CalledProcessError:
-        log.get_logger().warning(
-            f"Could not find open ports for {container_name}, please ensure it is configured correctly"
+        LOGGER.warning(
+            "Could not find open ports for %s, please ensure it is configured correctly",
+            container_name,
         )
         return []
 
@@ -65,31 +111,78 @@ def is_port_open(port):
     :return: True if open, false otherwise
     """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        # Do not hang on the system connect timeout if the connection is not refused right away
+        sock.settimeout(1)
         return sock.connect_ex(("127.0.0.1", port)) == 0
 
 
+@lru_cache()
+def _get_requests_session() -> "requests.Session":
+    # Only imported when waiting on a service, requests is by far the slowest module to import otherwise
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    import requests
+
+    # Keeps connections alive between attempts instead of connecting again each time
+    return requests.Session()
+
+
 def _is_path_responding(port: int, path: str) -> bool:
     with contextlib.suppress(Exception):
         return (
-            requests.get(f"http://localhost:{port}{path}", timeout=30).status_code
+            _get_requests_session()
+            .get(f"http://localhost:{port}{path}", timeout=_CHECK_PORT_TIMEOUT)
+            .status_code
             == 200
         )
+    return False
 
 
 def check_port(container_name: str, port: int, path: str) -> None:
-    total_time = 0.1
+    delay = _CHECK_PORT_INITIAL_DELAY
+    next_log_time = time.monotonic() + _CHECK_PORT_LOG_INTERVAL
     while not _is_path_responding(port, path):
-        message = f"Container {container_name} is not yet up, sleeping..."
-        if (total_time % 3) == 0:
-            log.get_logger().info(message)
+        if time.monotonic() >= next_log_time:
+            log_level = logging.INFO
+            next_log_time += _CHECK_PORT_LOG_INTERVAL
         else:
-            log.get_logger().debug(message)
-        total_time += 0.1
-        time.sleep(0.1)
+            log_level = logging.DEBUG
+        LOGGER.log(log_level, "Container %s is not yet up, sleeping...", container_name)
+        time.sleep(delay)
+        # Back off since services that are not up right away usually take a while to start
+        delay = min(delay * 1.5, _CHECK_PORT_MAX_DELAY)
+
+
+@lru_cache()
+def _read_services_from_dc(
+    docker_compose_path: str, mtime_ns: int, size: int
+) -> List[str]:
+    # pylint: disable=unused-argument
+    with open(docker_compose_path, "rb") as fobj:
+        root = yaml_utils.compose(fobj)
+    # Only the service names are needed, so walk the nodes instead of constructing every service definition
+    services = None
+    if isinstance(root, yaml.MappingNode):
+        for key_node, value_node in root.value:
+            if key_node.value == "services":
+                services = value_node
+    if not isinstance(services, yaml.MappingNode):
+        return []
+    if any(key_node.tag == _YAML_MERGE_TAG for key_node, _ in services.value):
+        # Merge keys add services from other nodes, load the document fully to resolve those
+        with open(docker_compose_path, "rb") as fobj:
+            return list(yaml_utils.safe_load(fobj)["services"].keys())
+    # Keys are only listed once, as when loading the mapping, even if they are duplicated
+    return list(dict.fromkeys(key_node.value for key_node, _ in services.value))
 
 
-def read_services_from_dc(docker_compose_path: str):
-    with open(docker_compose_path, encoding="utf8") as fobj:
-        data = yaml.safe_load(fobj)
-        services = data.get("services", {})
-        return services.keys()
+def read_services_from_dc(docker_compose_path: str) -> List[str]:
+    """
+    Reads the service names from a docker compose file. Files are only parsed again if they changed since
+    the last time they were read, since the generated files are rewritten during some commands.
+    :param docker_compose_path: The path to the docker compose file
+    :return: The service names
+    """
+    stat_result = os.stat(docker_compose_path)
+    return _read_services_from_dc(
+        docker_compose_path, stat_result.st_mtime_ns, stat_result.st_size
+    )
@@ -7,29 +7,60 @@ with the terms of the Adobe license agreement accompanying it.
 """
 
 import logging
+from typing import Optional
 
 
 # Global vars
-_LOGGER: logging.Logger = None
+_HANDLER: Optional[logging.Handler] = None
 
 
-def init_logger(debug: bool) -> None:
+class _Logger(logging.LoggerAdapter):
+    """
+    Logs through the pydc_control logger, configuring the handler with debug output on first use if that was not
+    done yet (as get_logger() does). run() configures it before any command, this keeps messages visible when the
+    modules are used without it.
+    """
+
+    def log(self, level, msg, *args, **kwargs):
+        if not _HANDLER:
+            init_logger(True)
+        super().log(level, msg, *args, **kwargs)
+
+
+# Logger used for all output, messages propagate to the handler configured on the root logger
+LOGGER = _Logger(logging.getLogger("pydc_control"), None)
+
+
+def init_logger(debug: bool, force: bool = False) -> None:
+    """
+    Configures the handler for all output. Calling this again with the same level does nothing, unless forced.
+    """
     # pylint: disable=global-statement
-    global _LOGGER
+    global _HANDLER
 
     log_level = logging.INFO
     if debug:
         log_level = logging.DEBUG
+    if _HANDLER and _HANDLER.level == log_level and not force:
+        # Already initialized with the same level, nothing to do
+        return
+
+    logger = logging.getLogger()
+    if _HANDLER:
+        # Replace the existing handler instead of adding another, otherwise every message is printed twice
+        logger.removeHandler(_HANDLER)
     log_handler = logging.StreamHandler()
     log_handler.setLevel(log_level)
 
-    logger = logging.getLogger()
     logger.setLevel(log_level)
     logger.addHandler(log_handler)
-    _LOGGER = logger
+    _HANDLER = log_handler
 
 
 def get_logger() -> logging.Logger:
-    if not _LOGGER:
+    """
+    Gets the logger used for all output, configuring the handler with debug output if that was not done yet.
+    """
+    if not _HANDLER:
         init_logger(True)
-    return _LOGGER
+    return LOGGER.logger
@@ -8,19 +8,18 @@ with the terms of the Adobe license agreement accompanying it.
 # pylint: disable=protected-access
 
 import os
-import tempfile
 
 import pytest
-import yaml
 
-from pydc_control import config, data
+from pydc_control import config, data, docker_utils, yaml_utils
 
 
 def _clear_caches():
-    data.Project.find_all.cache_clear()
+    data.clear_caches()
     config.get_env_file_path.cache_clear()
     config.get_docker_compose_path.cache_clear()
     config._get_config.cache_clear()
+    docker_utils._check_docker_network.cache_clear()
 
 
 @pytest.fixture(autouse=True)
@@ -31,13 +30,17 @@ def fixture_cleanup_caches():
 
 
 @pytest.fixture(name="temp_dir")
-def fixture_temp_dir():
-    with tempfile.TemporaryDirectory(prefix="pydc-control-test-") as temp_dir:
-        config.initialize(temp_dir)
-        yield temp_dir
+def fixture_temp_dir(tmp_path):
+    # pytest removes old temporary directories in bulk, instead of removing them after every test
+    temp_dir = str(tmp_path)
+    config.initialize(temp_dir)
+    return temp_dir
 
 
-def write_config(temp_dir: str, write_data: dict) -> None:
+def dump_config(write_data: dict) -> str:
+    """
+    Dumps the test config with the given data, tests that always use the same config can dump it only once.
+    """
     config_data = {
         "prefixes": {
             "service": "mynamespace_",
@@ -51,5 +54,13 @@ def write_config(temp_dir: str, write_data: dict) -> None:
         },
     }
     config_data.update(write_data)
+    return yaml_utils.safe_dump(config_data)
+
+
+def write_config_contents(temp_dir: str, contents: str) -> None:
     with open(os.path.join(temp_dir, "config.yml"), "w", encoding="utf8") as fobj:
-        yaml.safe_dump(config_data, fobj)
+        fobj.write(contents)
+
+
+def write_config(temp_dir: str, write_data: dict) -> None:
+    write_config_contents(temp_dir, dump_config(write_data))
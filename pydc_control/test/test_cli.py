@@ -0,0 +1,157 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import os
+from unittest import mock
+
+import pytest
+
+from pydc_control import cli, commands, config
+from . import fixture_cleanup_caches, fixture_temp_dir, write_config
+
+
+_ = fixture_cleanup_caches, fixture_temp_dir
+
+
+@pytest.fixture(autouse=True)
+def fixture_setup_project(temp_dir):
+    write_config(
+        temp_dir,
+        {
+            "projects": {
+                "project1": {
+                    "directory": "project1",
+                    "repository": "repo1",
+                    "services": [
+                        {
+                            "name": "service1",
+                        },
+                    ],
+                },
+            },
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "argv, func",
+    [
+        (["checkout"], commands.run_checkout),
+        (["co"], commands.run_checkout),
+        (["repo-status"], commands.get_repo_status),
+        (["rs"], commands.get_repo_status),
+        (["dc", "ps"], commands.run_docker_compose),
+        (["build"], commands.run_dc_build),
+        (["up"], commands.run_dc_up),
+        (["-p", "project1", "up-detach"], commands.run_dc_up_detach),
+    ],
+)
+def test_command_func(argv, func):
+    args = cli._parse_args(None, argv)
+    assert args.command in argv
+    # The commands module is only used once the command is run
+    with mock.patch.object(commands, func.__name__, return_value=os.EX_OK) as command:
+        assert args.func(args) == os.EX_OK
+    assert command.call_args == mock.call(args)
+
+
+@pytest.mark.parametrize(
+    "argv, no_parallel",
+    [
+        (["co"], False),
+        (["co", "--no-parallel"], True),
+        (["rs", "--no-parallel"], True),
+    ],
+)
+def test_no_parallel(argv, no_parallel):
+    args = cli._parse_args(None, argv)
+    assert args.no_parallel is no_parallel
+    assert commands._get_git_workers(args, 4) == (1 if no_parallel else 4)
+
+
+def test_no_command():
+    args = cli._parse_args(None, [])
+    assert args.command is None
+
+
+def test_command_arguments():
+    args = cli._parse_args(None, ["co", "-a", "-e", "origin", "bob"])
+    assert args.all_projects is True
+    assert args.extra_remotes == [["origin", "bob"]]
+
+
+def test_help_lists_commands(capsys):
+    with pytest.raises(SystemExit):
+        cli._parse_args(None, ["--help"])
+    output = capsys.readouterr().out
+    for command in ("checkout", "repo-status", "docker-compose", "up-recreate"):
+        assert command in output
+
+
+def test_configure_parsers():
+    def configure_parsers(parser, subparsers):
+        subparsers.add_parser("custom").set_defaults(func=print)
+
+    args = cli._parse_args(configure_parsers, ["custom"])
+    assert args.func is print
+
+
+def test_configure_parsers_extend_command():
+    def configure_parsers(parser, subparsers):
+        subparsers.choices["up"].add_argument("--extra", action="store_true")
+
+    args = cli._parse_args(configure_parsers, ["up", "--extra"])
+    assert args.command == "up"
+    assert args.extra is True
+
+
+@pytest.mark.parametrize(
+    "argv, result",
+    [
+        (["co"], os.EX_OK),
+        (["co", "-e", "bob", "-e", "origin", "alice"], os.EX_OK),
+        (["co", "-e"], os.EX_USAGE),
+        (["co", "-e", "origin", "bob", "alice"], os.EX_USAGE),
+        (["up"], os.EX_OK),
+    ],
+)
+def test_validate_extra_remotes(argv, result):
+    args = cli._parse_args(None, argv)
+    assert cli._validate_args(args) == result
+
+
+def test_detect_current_project_shared_directory(temp_dir):
+    write_config(
+        temp_dir,
+        {
+            "projects": {
+                "project1": {
+                    "directory": "project1",
+                    "repository": "repo1",
+                    "services": [],
+                },
+                "project2": {
+                    "directory": "project1",
+                    "repository": "repo1",
+                    "services": [],
+                },
+                "project3": {
+                    "directory": "project3",
+                    "repository": "repo3",
+                    "services": [],
+                },
+            },
+        },
+    )
+    config.initialize(temp_dir, force=True)
+    dev_project_names = ["project3"]
+    with mock.patch("os.getcwd", return_value=os.path.join(temp_dir, "project1")):
+        cli._detect_current_project(dev_project_names)
+    # Every project checked out to the current directory is developed
+    assert dev_project_names == ["project3", "project1", "project2"]
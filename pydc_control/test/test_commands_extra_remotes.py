@@ -0,0 +1,65 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import os
+import subprocess
+
+import pytest
+
+from pydc_control import commands, config, data
+
+from . import fixture_cleanup_caches, fixture_temp_dir, write_config
+
+
+_ = fixture_cleanup_caches, fixture_temp_dir
+
+
+@pytest.fixture(name="project")
+def fixture_project(temp_dir):
+    # Projects are located next to the control project (the base dir)
+    base_dir = os.path.join(temp_dir, "control")
+    os.mkdir(base_dir)
+    project_dir = os.path.join(temp_dir, "project1")
+    os.mkdir(project_dir)
+    subprocess.check_call(["git", "init", "-q"], cwd=project_dir)
+    config.initialize(base_dir)
+    write_config(
+        base_dir,
+        {
+            "projects": {
+                "project1": {
+                    "directory": "project1",
+                    "repository": "git@github.com:org1/project1.git",
+                    "services": [],
+                },
+            },
+        },
+    )
+    return data.Project.find_one("project1")
+
+
+def _get_remote_url(project: data.Project, name: str) -> str:
+    return subprocess.check_output(
+        ["git", "remote", "get-url", name], cwd=project.path, encoding="utf8"
+    ).strip()
+
+
+def test_add_remotes(project):
+    commands._handle_extra_remotes([["bob"], ["alice", "upstream"]], project)
+    assert commands._get_git_remotes(project) == {"bob", "upstream"}
+    assert _get_remote_url(project, "bob") == "git@github.com:bob/project1.git"
+    assert _get_remote_url(project, "upstream") == "git@github.com:alice/project1.git"
+
+
+def test_existing_remotes(project):
+    commands._handle_extra_remotes([["bob"]], project)
+    # Adding the same remote again (or another org with the same name) keeps the existing remote
+    commands._handle_extra_remotes([["bob"], ["alice", "bob"]], project)
+    assert commands._get_git_remotes(project) == {"bob"}
+    assert _get_remote_url(project, "bob") == "git@github.com:bob/project1.git"
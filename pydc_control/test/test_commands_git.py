@@ -0,0 +1,124 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import argparse
+import os
+import subprocess
+from unittest import mock
+
+import pytest
+
+from pydc_control import commands, config, data
+
+from . import fixture_cleanup_caches, fixture_temp_dir, write_config
+
+
+_ = fixture_cleanup_caches, fixture_temp_dir
+
+
+@pytest.fixture(name="projects")
+def fixture_projects(temp_dir):
+    base_dir = os.path.join(temp_dir, "control")
+    os.mkdir(base_dir)
+    project_config = {}
+    for name in ("project1", "project2"):
+        project_dir = os.path.join(temp_dir, name)
+        os.mkdir(project_dir)
+        subprocess.check_call(["git", "init", "-q"], cwd=project_dir)
+        # Pulling needs a branch to get changes for
+        subprocess.check_call(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+            + ["commit", "-q", "--allow-empty", "-m", "Initial commit"],
+            cwd=project_dir,
+        )
+        project_config[name] = {
+            "directory": name,
+            "repository": f"git@github.com:org1/{name}.git",
+            "services": [],
+        }
+    config.initialize(base_dir)
+    write_config(base_dir, {"projects": project_config})
+    return data.Project.find_all()
+
+
+def _get_args(no_parallel: bool) -> argparse.Namespace:
+    return argparse.Namespace(
+        all_projects=True, dev_project_names=[], no_parallel=no_parallel
+    )
+
+
+def test_call_git_captured_no_prompt(temp_dir):
+    with mock.patch.dict(os.environ):
+        os.environ.pop("GIT_SSH_COMMAND", None)
+        os.environ.pop("GIT_SSH", None)
+        exit_code, output = commands._call_git_captured(
+            ["sh", "-c", 'echo "$GIT_TERMINAL_PROMPT:$GIT_SSH_COMMAND"'], temp_dir
+        )
+    assert exit_code == 0
+    assert output == "0:ssh -o BatchMode=yes\n"
+
+
+def test_call_git_captured_keeps_ssh_command(temp_dir):
+    with mock.patch.dict(os.environ, {"GIT_SSH_COMMAND": "ssh -i my_key"}):
+        _, output = commands._call_git_captured(
+            ["sh", "-c", 'echo "$GIT_SSH_COMMAND"'], temp_dir
+        )
+    assert output == "ssh -i my_key\n"
+
+
+def test_git_workers_without_no_parallel():
+    # Control scripts may build their own arguments without the --no-parallel flag
+    assert commands._get_git_workers(argparse.Namespace(), 3) == 3
+    assert commands._get_git_workers(argparse.Namespace(no_parallel=True), 3) == 1
+
+
+def test_repo_status_no_parallel(projects):
+    with mock.patch.object(subprocess, "call", return_value=0) as call, mock.patch(
+        "pydc_control.commands._call_git_captured"
+    ) as call_git_captured:
+        commands.get_repo_status(_get_args(no_parallel=True))
+    # Git runs with the terminal instead of having its output captured
+    assert call.call_args_list == [
+        mock.call(commands._REPO_STATUS_COMMAND, cwd=project.path)
+        for project in projects
+    ]
+    call_git_captured.assert_not_called()
+
+
+def test_repo_status_parallel(projects):
+    with mock.patch.object(subprocess, "call", return_value=0) as call, mock.patch(
+        "pydc_control.commands._call_git_captured", return_value=(0, "")
+    ) as call_git_captured:
+        commands.get_repo_status(_get_args(no_parallel=False))
+    call.assert_not_called()
+    assert sorted(
+        call_args.args[1] for call_args in call_git_captured.call_args_list
+    ) == sorted(project.path for project in projects)
+
+
+def test_checkout_no_parallel(projects):
+    with mock.patch.object(subprocess, "call", return_value=0) as call, mock.patch(
+        "pydc_control.commands._call_git_captured"
+    ) as call_git_captured:
+        assert (
+            commands.run_checkout(
+                argparse.Namespace(
+                    extra_remotes=[], **vars(_get_args(no_parallel=True))
+                )
+            )
+            == os.EX_OK
+        )
+    # Each project is pulled in order with git writing directly to the terminal
+    assert [call_args.args[0][:3] for call_args in call.call_args_list] == [
+        ["git", "pull", "upstream"]
+    ] * len(projects)
+    assert [call_args.kwargs["cwd"] for call_args in call.call_args_list] == [
+        project.path for project in projects
+    ]
+    call_git_captured.assert_not_called()
@@ -0,0 +1,82 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+from unittest import mock
+
+import pytest
+
+from pydc_control import commands, data
+
+from . import fixture_cleanup_caches, fixture_temp_dir, write_config
+
+
+_ = fixture_cleanup_caches, fixture_temp_dir
+
+
+@pytest.fixture(name="service")
+def fixture_service(temp_dir):
+    write_config(
+        temp_dir,
+        {
+            "projects": {
+                "project1": {
+                    "directory": "project1",
+                    "repository": "repo1",
+                    "services": [{"name": "service1", "core": True}],
+                },
+            },
+        },
+    )
+    return data.Service.find_all()[0]
+
+
+@pytest.fixture(name="sleep")
+def fixture_sleep():
+    with mock.patch("time.sleep") as sleep:
+        yield sleep
+
+
+def test_wait_for_listed_ports(service, sleep):
+    with mock.patch.object(
+        commands.docker_utils,
+        "get_open_ports",
+        side_effect=[[], {}, {8080: 80}],
+    ) as get_open_ports, mock.patch.object(
+        commands.docker_utils, "is_port_open", return_value=True
+    ):
+        commands._wait_for_open_ports(service)
+    assert get_open_ports.call_count == 3
+    assert get_open_ports.call_args == mock.call("core_service1")
+    assert [call.args[0] for call in sleep.call_args_list] == [0.02, 0.03]
+
+
+def test_wait_for_all_ports(service, sleep):
+    open_results = {
+        80: iter([False, False, True]),
+        81: iter([True]),
+    }
+    with mock.patch.object(
+        commands.docker_utils, "get_open_ports", return_value={8080: 80, 8081: 81}
+    ), mock.patch.object(
+        commands.docker_utils,
+        "is_port_open",
+        side_effect=lambda port: next(open_results[port]),
+    ) as is_port_open:
+        commands._wait_for_open_ports(service)
+    # Ports that are already open are not checked again
+    assert [call.args[0] for call in is_port_open.call_args_list] == [80, 81, 80, 80]
+    assert sleep.call_count == 2
+
+
+def test_wait_delays_are_capped():
+    delays = commands._get_wait_delays()
+    values = [next(delays) for _ in range(20)]
+    assert values[0] == commands._WAIT_INITIAL_DELAY
+    assert values == sorted(values)
+    assert values[-1] == commands._WAIT_MAX_DELAY
@@ -7,9 +7,11 @@ with the terms of the Adobe license agreement accompanying it.
 """
 # pylint: disable=protected-access
 
+import os
+
 import pytest
 
-from pydc_control import data, cli, exceptions
+from pydc_control import data, cli, config, exceptions
 from . import fixture_cleanup_caches, fixture_temp_dir, write_config
 
 
@@ -84,6 +86,101 @@ def test_projects_with_services(temp_dir):
     assert projects[1].name == "project2"
     assert len(projects[1].services) == 1
     assert projects[1].services[0].name == "service3"
+    # Services are only created once for each project
+    assert projects[1].services is projects[1].services
+    assert data.Service.find_all()[0] is projects[0].services[0]
+
+
+def test_find_project(temp_dir):
+    write_config(
+        temp_dir,
+        {
+            "projects": {
+                "project1": {
+                    "directory": "dir1",
+                    "repository": "repo1",
+                    "services": [],
+                },
+                "project2": {
+                    "directory": None,
+                    "repository": None,
+                    "services": [],
+                },
+            },
+        },
+    )
+    assert data.Project.find_one("project1").directory == "dir1"
+    assert data.Project.find_one("dir1") is None
+    assert [project.name for project in data.Project.find_all_by_directory("dir1")] == [
+        "project1"
+    ]
+    assert data.Project.find_all_by_directory("project1") == []
+    assert data.Project.find_all_by_directory("dir2") == []
+    # Project paths are next to the control project (the base dir)
+    expected_path = os.path.realpath(os.path.join(temp_dir, "..", "dir1"))
+    assert data.Project.find_one("project1").path == expected_path
+    with pytest.raises(exceptions.KnownException):
+        _ = data.Project.find_one("project2").path
+
+
+def test_find_service(temp_dir):
+    write_config(
+        temp_dir,
+        {
+            "projects": {
+                "project1": {
+                    "directory": "dir1",
+                    "repository": "repo1",
+                    "services": [{"name": "service1"}, {"name": "service2"}],
+                },
+                "project2": {
+                    "directory": "dir2",
+                    "repository": "repo2",
+                    "services": [{"name": "service1", "core": True}],
+                },
+            },
+        },
+    )
+    assert data.Service.find_one("service2").project_name == "project1"
+    # The first service is found if names are duplicated
+    assert data.Service.find_one("service1").project_name == "project1"
+    assert data.Service.find_one("service3") is None
+
+
+def test_get_dc_data(temp_dir):
+    write_config(
+        temp_dir,
+        {
+            "projects": {
+                "project1": {
+                    "directory": "dir1",
+                    "repository": "repo1",
+                    "services": [
+                        {
+                            "name": "service1",
+                            "enable": True,
+                            "image_path": "path/service1",
+                            "ports": ["80"],
+                        },
+                    ],
+                },
+            },
+        },
+    )
+    service = data.Service.find_one("service1")
+    dc_data = service.get_dc_data("registry/", "latest")
+    assert list(dc_data.items()) == [
+        ("container_name", "mynamespace_service1"),
+        ("image", "registry/path/service1:latest"),
+        ("ports", ["80"]),
+    ]
+    # Changes to the returned data must not leak into later calls, which may use another tag
+    dc_data["networks"] = ["network1"]
+    assert service.get_dc_data("registry/", "dev") == {
+        "container_name": "mynamespace_service1",
+        "image": "registry/path/service1:dev",
+        "ports": ["80"],
+    }
 
 
 @pytest.mark.parametrize(
@@ -142,3 +239,57 @@ def test_is_enabled(service_name, argv, result, temp_dir):
     args = cli._parse_args(None, argv)
     service = data.Service.find_one(service_name)
     assert service.is_enabled(args) is result
+
+
+def test_initialize_new_base_dir(temp_dir):
+    projects = {
+        "project1": {
+            "directory": "dir1",
+            "repository": "repo1",
+            "services": [{"name": "service1"}],
+        },
+    }
+    write_config(temp_dir, {"projects": projects})
+    previous_service = data.Service.find_one("service1")
+    assert previous_service.container_name == "mynamespace_service1"
+    previous_project = data.Project.find_one("project1")
+    assert previous_project.path == os.path.realpath(
+        os.path.join(temp_dir, "..", "dir1")
+    )
+
+    # Everything loaded from the previous config must be dropped when the base dir changes
+    other_dir = os.path.join(temp_dir, "other")
+    os.mkdir(other_dir)
+    projects["project2"] = projects.pop("project1")
+    write_config(
+        other_dir,
+        {"prefixes": {"service": "other_", "core": "core_"}, "projects": projects},
+    )
+    config.initialize(other_dir)
+    assert [project.name for project in data.Project.find_all()] == ["project2"]
+    assert data.Project.find_one("project1") is None
+    service = data.Service.find_one("service1")
+    assert service.project_name == "project2"
+    assert service.container_name == "other_service1"
+    # Memoized values of instances that are still referenced are not kept either
+    assert previous_service.container_name == "other_service1"
+    assert previous_project.path == os.path.realpath(
+        os.path.join(other_dir, "..", "dir1")
+    )
+
+
+def test_initialize_force(temp_dir):
+    projects = {
+        "project1": {"directory": "dir1", "repository": "repo1", "services": []},
+    }
+    write_config(temp_dir, {"projects": projects})
+    assert data.Project.find_one("project1")
+    projects["project2"] = projects.pop("project1")
+    write_config(temp_dir, {"projects": projects})
+
+    # The same base dir does not reload the config unless forced
+    config.initialize(temp_dir)
+    assert data.Project.find_one("project2") is None
+    config.initialize(temp_dir, force=True)
+    assert data.Project.find_one("project1") is None
+    assert data.Project.find_one("project2")
@@ -16,11 +16,85 @@ import pytest
 
 from pydc_control import docker_compose_utils
 
-from . import fixture_cleanup_caches, fixture_temp_dir, write_config
+from . import (
+    dump_config,
+    fixture_cleanup_caches,
+    fixture_temp_dir,
+    write_config_contents,
+)
 
 
 _ = fixture_cleanup_caches, fixture_temp_dir
 
+# The config is the same for every test, so it is only dumped once
+_CONFIG_CONTENTS = dump_config(
+    {
+        "projects": {
+            "project-dynamic-options": {
+                "directory": "project-dynamic-options",
+                "repository": "repo1",
+                "services": [
+                    {
+                        "name": "dyn1",
+                        "enable": True,
+                        "image": "containous/whoami:latest",
+                        "dynamic-options": {
+                            "DYNAMIC1_BOTH": {
+                                "enabled": "enabled",
+                                "disabled": "disabled",
+                            },
+                            "DYNAMIC1_ENABLED": {
+                                "enabled": "enabled",
+                                # Test empty values
+                                "disabled": "",
+                            },
+                            "DYNAMIC1_DISABLED": {
+                                "disabled": "disabled",
+                            },
+                        },
+                    },
+                    {
+                        "name": "dyn2",
+                        "enable": True,
+                        "image": "containous/whoami:latest",
+                        "dynamic-options": {
+                            "DYNAMIC2_BOTH": {
+                                "enabled": "enabled",
+                                "disabled": "disabled",
+                            },
+                            "DYNAMIC2_ENABLED": {
+                                "enabled": "enabled",
+                            },
+                            "DYNAMIC2_DISABLED": {
+                                # Test empty values
+                                "enabled": "",
+                                "disabled": "disabled",
+                            },
+                        },
+                    },
+                    {
+                        "name": "dyn3",
+                        "disable": True,
+                        "image": "containous/whoami:latest",
+                        "dynamic-options": {
+                            "DYNAMIC3_BOTH": {
+                                "enabled": "enabled",
+                                "disabled": "disabled",
+                            },
+                            "DYNAMIC3_ENABLED": {
+                                "enabled": "enabled",
+                            },
+                            "DYNAMIC3_DISABLED": {
+                                "disabled": "disabled",
+                            },
+                        },
+                    },
+                ],
+            }
+        }
+    }
+)
+
 
 def _get_docker_compose_env_path(temp_dir: str) -> str:
     return os.path.join(temp_dir, "docker-compose.env")
@@ -34,74 +108,7 @@ def fixture_setup_project(temp_dir):
         fobj.write("ENV_VAR1=val1\n")
 
     # Write config file
-    write_config(
-        temp_dir,
-        {
-            "projects": {
-                "project-dynamic-options": {
-                    "directory": "project-dynamic-options",
-                    "repository": "repo1",
-                    "services": [
-                        {
-                            "name": "dyn1",
-                            "enable": True,
-                            "image": "containous/whoami:latest",
-                            "dynamic-options": {
-                                "DYNAMIC1_BOTH": {
-                                    "enabled": "enabled",
-                                    "disabled": "disabled",
-                                },
-                                "DYNAMIC1_ENABLED": {
-                                    "enabled": "enabled",
-                                    # Test empty values
-                                    "disabled": "",
-                                },
-                                "DYNAMIC1_DISABLED": {
-                                    "disabled": "disabled",
-                                },
-                            },
-                        },
-                        {
-                            "name": "dyn2",
-                            "enable": True,
-                            "image": "containous/whoami:latest",
-                            "dynamic-options": {
-                                "DYNAMIC2_BOTH": {
-                                    "enabled": "enabled",
-                                    "disabled": "disabled",
-                                },
-                                "DYNAMIC2_ENABLED": {
-                                    "enabled": "enabled",
-                                },
-                                "DYNAMIC2_DISABLED": {
-                                    # Test empty values
-                                    "enabled": "",
-                                    "disabled": "disabled",
-                                },
-                            },
-                        },
-                        {
-                            "name": "dyn3",
-                            "disable": True,
-                            "image": "containous/whoami:latest",
-                            "dynamic-options": {
-                                "DYNAMIC3_BOTH": {
-                                    "enabled": "enabled",
-                                    "disabled": "disabled",
-                                },
-                                "DYNAMIC3_ENABLED": {
-                                    "enabled": "enabled",
-                                },
-                                "DYNAMIC3_DISABLED": {
-                                    "disabled": "disabled",
-                                },
-                            },
-                        },
-                    ],
-                }
-            }
-        },
-    )
+    write_config_contents(temp_dir, _CONFIG_CONTENTS)
 
 
 def _get_env_lines(temp_dir: str) -> List[str]:
@@ -119,38 +126,97 @@ def _get_args(
     return namespace
 
 
-def test_defaults(temp_dir):
-    docker_compose_utils._set_dynamic_options(_get_args())
-    assert _get_env_lines(temp_dir) == [
-        "ENV_VAR1=val1",
-        "DYNAMIC1_BOTH=disabled",
-        "DYNAMIC1_DISABLED=disabled",
-        "DYNAMIC2_BOTH=disabled",
-        "DYNAMIC2_DISABLED=disabled",
-        "DYNAMIC3_BOTH=enabled",
-        "DYNAMIC3_ENABLED=enabled",
-    ]
+def _set_dynamic_options(args: argparse.Namespace) -> None:
+    docker_compose_utils._set_dynamic_options(
+        docker_compose_utils._get_enabled_services(args),
+        docker_compose_utils._read_env_file(),
+    )
 
 
-def test_none_enabled(temp_dir):
-    docker_compose_utils._set_dynamic_options(_get_args(disable_dyn3=True))
-    assert _get_env_lines(temp_dir) == [
-        "ENV_VAR1=val1",
-        "DYNAMIC1_BOTH=disabled",
-        "DYNAMIC1_DISABLED=disabled",
-        "DYNAMIC2_BOTH=disabled",
-        "DYNAMIC2_DISABLED=disabled",
-        "DYNAMIC3_BOTH=disabled",
-        "DYNAMIC3_DISABLED=disabled",
-    ]
+@pytest.mark.parametrize(
+    "args_kwargs, env_lines",
+    [
+        pytest.param(
+            {},
+            [
+                "ENV_VAR1=val1",
+                "DYNAMIC1_BOTH=disabled",
+                "DYNAMIC1_DISABLED=disabled",
+                "DYNAMIC2_BOTH=disabled",
+                "DYNAMIC2_DISABLED=disabled",
+                "DYNAMIC3_BOTH=enabled",
+                "DYNAMIC3_ENABLED=enabled",
+            ],
+            id="defaults",
+        ),
+        pytest.param(
+            {"disable_dyn3": True},
+            [
+                "ENV_VAR1=val1",
+                "DYNAMIC1_BOTH=disabled",
+                "DYNAMIC1_DISABLED=disabled",
+                "DYNAMIC2_BOTH=disabled",
+                "DYNAMIC2_DISABLED=disabled",
+                "DYNAMIC3_BOTH=disabled",
+                "DYNAMIC3_DISABLED=disabled",
+            ],
+            id="none_enabled",
+        ),
+        pytest.param(
+            {"enable_dyn1": True},
+            [
+                "ENV_VAR1=val1",
+                "DYNAMIC1_BOTH=enabled",
+                "DYNAMIC1_ENABLED=enabled",
+                "DYNAMIC2_BOTH=disabled",
+                "DYNAMIC2_DISABLED=disabled",
+                "DYNAMIC3_BOTH=enabled",
+                "DYNAMIC3_ENABLED=enabled",
+            ],
+            id="dyn1_enabled",
+        ),
+        pytest.param(
+            {"enable_dyn2": True, "disable_dyn3": True},
+            [
+                "ENV_VAR1=val1",
+                "DYNAMIC1_BOTH=disabled",
+                "DYNAMIC1_DISABLED=disabled",
+                "DYNAMIC2_BOTH=enabled",
+                "DYNAMIC2_ENABLED=enabled",
+                "DYNAMIC3_BOTH=disabled",
+                "DYNAMIC3_DISABLED=disabled",
+            ],
+            id="dyn2_enabled_dyn3_disabled",
+        ),
+    ],
+)
+def test_enabled_status(temp_dir, args_kwargs, env_lines):
+    _set_dynamic_options(_get_args(**args_kwargs))
+    assert _get_env_lines(temp_dir) == env_lines
 
 
-def test_dyn1_enabled(temp_dir):
-    docker_compose_utils._set_dynamic_options(_get_args(enable_dyn1=True))
+def test_consistent_output(temp_dir):
+    # Ensures that multiple runs of setting dynamic options doesn't change anything
+    _set_dynamic_options(_get_args())
+    env_lines = _get_env_lines(temp_dir)
+    _set_dynamic_options(_get_args())
+    assert env_lines == _get_env_lines(temp_dir)
+
+
+def test_existing_options(temp_dir):
+    with open(_get_docker_compose_env_path(temp_dir), "w", encoding="utf8") as fobj:
+        fobj.write(
+            "DYNAMIC1_BOTH=enabled\n"
+            "ENV_VAR1=val1\n"
+            "DYNAMIC1_BOTH_SUFFIX=unchanged\n"
+            "DYNAMIC2_ENABLED=enabled\n"
+        )
+    _set_dynamic_options(_get_args())
     assert _get_env_lines(temp_dir) == [
+        "DYNAMIC1_BOTH=disabled",
         "ENV_VAR1=val1",
-        "DYNAMIC1_BOTH=enabled",
-        "DYNAMIC1_ENABLED=enabled",
+        "DYNAMIC1_BOTH_SUFFIX=unchanged",
+        "DYNAMIC1_DISABLED=disabled",
         "DYNAMIC2_BOTH=disabled",
         "DYNAMIC2_DISABLED=disabled",
         "DYNAMIC3_BOTH=enabled",
@@ -158,24 +224,19 @@ def test_dyn1_enabled(temp_dir):
     ]
 
 
-def test_dyn2_enabled_dyn3_disabled(temp_dir):
-    docker_compose_utils._set_dynamic_options(
-        _get_args(enable_dyn2=True, disable_dyn3=True)
-    )
-    assert _get_env_lines(temp_dir) == [
-        "ENV_VAR1=val1",
-        "DYNAMIC1_BOTH=disabled",
-        "DYNAMIC1_DISABLED=disabled",
-        "DYNAMIC2_BOTH=enabled",
-        "DYNAMIC2_ENABLED=enabled",
-        "DYNAMIC3_BOTH=disabled",
-        "DYNAMIC3_DISABLED=disabled",
-    ]
-
-
-def test_consistent_output(temp_dir):
-    # Ensures that multiple runs of setting dynamic options doesn't change anything
-    docker_compose_utils._set_dynamic_options(_get_args())
-    env_lines = _get_env_lines(temp_dir)
-    docker_compose_utils._set_dynamic_options(_get_args())
-    assert env_lines == _get_env_lines(temp_dir)
+def test_missing_trailing_newline(temp_dir):
+    with open(_get_docker_compose_env_path(temp_dir), "w", encoding="utf8") as fobj:
+        fobj.write("# Comment\n\nENV_VAR1=val1")
+    _set_dynamic_options(_get_args())
+    with open(_get_docker_compose_env_path(temp_dir), encoding="utf8") as fobj:
+        assert fobj.read() == (
+            "# Comment\n"
+            "\n"
+            "ENV_VAR1=val1\n"
+            "DYNAMIC1_BOTH=disabled\n"
+            "DYNAMIC1_DISABLED=disabled\n"
+            "DYNAMIC2_BOTH=disabled\n"
+            "DYNAMIC2_DISABLED=disabled\n"
+            "DYNAMIC3_BOTH=enabled\n"
+            "DYNAMIC3_ENABLED=enabled\n"
+        )
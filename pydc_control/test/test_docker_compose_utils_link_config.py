@@ -0,0 +1,73 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import os
+
+import pytest
+
+from pydc_control import config, data, docker_compose_utils
+
+from . import fixture_cleanup_caches, fixture_temp_dir, write_config
+
+
+_ = fixture_cleanup_caches, fixture_temp_dir
+
+
+@pytest.fixture(name="project")
+def fixture_project(temp_dir):
+    # Projects are located next to the control project (the base dir)
+    base_dir = os.path.join(temp_dir, "control")
+    os.mkdir(base_dir)
+    os.mkdir(os.path.join(temp_dir, "project1"))
+    config.initialize(base_dir)
+    write_config(
+        base_dir,
+        {
+            "projects": {
+                "project1": {
+                    "directory": "project1",
+                    "repository": "repo1",
+                    "services": [],
+                },
+            },
+        },
+    )
+    with open(config.get_env_file_path(), "w", encoding="utf8") as fobj:
+        fobj.write("ENV_VAR1=val1\n")
+    return data.Project.find_one("project1")
+
+
+def _get_env_project_path(project: data.Project) -> str:
+    return os.path.join(project.path, config.ENV_FILE)
+
+
+def test_link_missing(project):
+    docker_compose_utils._link_config([project])
+    assert os.readlink(_get_env_project_path(project)) == config.get_env_file_path()
+
+
+def test_link_replaces_file(project):
+    with open(_get_env_project_path(project), "w", encoding="utf8") as fobj:
+        fobj.write("ENV_VAR1=other\n")
+    docker_compose_utils._link_config([project])
+    assert os.readlink(_get_env_project_path(project)) == config.get_env_file_path()
+
+
+def test_link_existing(project):
+    docker_compose_utils._link_config([project])
+    docker_compose_utils._link_config([project])
+    assert os.readlink(_get_env_project_path(project)) == config.get_env_file_path()
+
+
+def test_link_replaces_dangling(project):
+    os.symlink(
+        os.path.join(project.path, "missing.env"), _get_env_project_path(project)
+    )
+    docker_compose_utils._link_config([project])
+    assert os.readlink(_get_env_project_path(project)) == config.get_env_file_path()
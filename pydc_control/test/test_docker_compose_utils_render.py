@@ -0,0 +1,94 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import os
+from typing import List
+
+import pytest
+
+from pydc_control import config, data, docker_compose_utils
+from pydc_control.exceptions import KnownException
+
+from . import fixture_cleanup_caches, fixture_temp_dir, write_config
+
+
+_ = fixture_cleanup_caches, fixture_temp_dir
+
+
+@pytest.fixture(name="projects")
+def fixture_projects(temp_dir):
+    # Projects are located next to the control project (the base dir)
+    base_dir = os.path.join(temp_dir, "control")
+    os.mkdir(base_dir)
+    projects = {}
+    for index in range(1, 4):
+        project_name = f"project{index}"
+        project_dir = os.path.join(temp_dir, project_name)
+        os.mkdir(project_dir)
+        with open(
+            os.path.join(project_dir, config.DOCKER_COMPOSE_TEMPLATE),
+            "w",
+            encoding="utf8",
+        ) as fobj:
+            fobj.write(f"# {project_name} {{{{ tag }}}} {{{{ network }}}}\n")
+        projects[project_name] = {
+            "directory": project_name,
+            "repository": f"repo{index}",
+            "services": [],
+        }
+    config.initialize(base_dir)
+    write_config(base_dir, {"projects": projects})
+    return data.Project.find_all()
+
+
+def _read_docker_compose_file(project: data.Project) -> str:
+    with open(
+        os.path.join(project.path, config.DOCKER_COMPOSE_FILE), encoding="utf8"
+    ) as fobj:
+        return fobj.read()
+
+
+def test_render_all(projects: List[data.Project]):
+    docker_compose_utils._generate_docker_compose({}, projects, "latest")
+    for project in projects:
+        assert _read_docker_compose_file(project) == f"# {project.name} latest project1"
+
+
+def test_render_syntax_error(projects: List[data.Project]):
+    with open(
+        os.path.join(projects[1].path, config.DOCKER_COMPOSE_TEMPLATE),
+        "w",
+        encoding="utf8",
+    ) as fobj:
+        fobj.write("{% if %}\n")
+    with pytest.raises(KnownException, match=projects[1].path):
+        docker_compose_utils._generate_docker_compose({}, projects, "latest")
+
+
+def test_render_changed_template(projects: List[data.Project]):
+    docker_compose_utils._generate_docker_compose({}, projects, "latest")
+    with open(
+        os.path.join(projects[0].path, config.DOCKER_COMPOSE_TEMPLATE),
+        "w",
+        encoding="utf8",
+    ) as fobj:
+        fobj.write("# changed {{ tag }}\n")
+    # A new environment (as in a new run) must not load the stale template from the bytecode cache
+    docker_compose_utils._get_template_environment.cache_clear()
+    docker_compose_utils._generate_docker_compose({}, projects, "latest")
+    assert _read_docker_compose_file(projects[0]) == "# changed latest"
+
+
+def test_render_no_template(projects: List[data.Project]):
+    os.remove(os.path.join(projects[2].path, config.DOCKER_COMPOSE_TEMPLATE))
+    docker_compose_utils._generate_docker_compose({}, projects, "latest")
+    assert not os.path.exists(
+        os.path.join(projects[2].path, config.DOCKER_COMPOSE_FILE)
+    )
+    assert _read_docker_compose_file(projects[0]) == "# project1 latest project1"
@@ -0,0 +1,58 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import pytest
+
+from pydc_control import docker_compose_utils
+from pydc_control.exceptions import KnownException
+
+from . import fixture_cleanup_caches, fixture_temp_dir, write_config
+
+
+_ = fixture_cleanup_caches, fixture_temp_dir
+
+
+@pytest.fixture(autouse=True, name="setup_config")
+def fixture_setup_config(temp_dir):
+    write_config(
+        temp_dir,
+        {
+            "required-options": ["OPTION1", "OPTION2"],
+            "projects": {
+                "project1": {
+                    "directory": "project1",
+                    "repository": "repo1",
+                    "services": [],
+                },
+            },
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        "OPTION1=value1\nOPTION2=value2\n",
+        "# Comment\n  OPTION2 = value2\n\nOPTION1\n",
+    ],
+)
+def test_required_options(contents):
+    docker_compose_utils._check_required_options(contents)
+
+
+@pytest.mark.parametrize(
+    "contents, missing",
+    [
+        ("OPTION1=value1\n", "OPTION2 option"),
+        ("# OPTION1=value1\nOPTION1_SUFFIX=OPTION2\n", "OPTION1, OPTION2 options"),
+    ],
+)
+def test_missing_required_options(contents, missing):
+    with pytest.raises(KnownException, match=f"must include the {missing}$"):
+        docker_compose_utils._check_required_options(contents)
@@ -0,0 +1,85 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import os
+import stat
+from unittest import mock
+
+import pytest
+
+from pydc_control import docker_compose_utils
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf8") as fobj:
+        return fobj.read()
+
+
+def test_write_new(tmp_path):
+    path = str(tmp_path / "file.yml")
+    docker_compose_utils._write_file(path, "contents\n")
+    assert _read(path) == "contents\n"
+    assert os.listdir(tmp_path) == ["file.yml"]
+
+
+def test_write_unchanged(tmp_path):
+    path = str(tmp_path / "file.yml")
+    docker_compose_utils._write_file(path, "contents\n")
+    inode = os.stat(path).st_ino
+    docker_compose_utils._write_file(path, "contents\n")
+    # The file must not be replaced if nothing changed
+    assert os.stat(path).st_ino == inode
+
+
+def test_write_changed(tmp_path):
+    path = str(tmp_path / "file.yml")
+    docker_compose_utils._write_file(path, "contents\n")
+    docker_compose_utils._write_file(path, "other\n")
+    assert _read(path) == "other\n"
+
+
+def test_write_symlink(tmp_path):
+    target_path = str(tmp_path / "target.yml")
+    docker_compose_utils._write_file(target_path, "contents\n")
+    link_path = str(tmp_path / "link.yml")
+    os.symlink(target_path, link_path)
+    docker_compose_utils._write_file(link_path, "other\n")
+    assert os.readlink(link_path) == target_path
+    assert _read(target_path) == "other\n"
+
+
+def _get_mode(path: str) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_write_new_mode(tmp_path):
+    path = str(tmp_path / "file.yml")
+    docker_compose_utils._write_file(path, "contents\n")
+    assert _get_mode(path) == 0o666 & ~docker_compose_utils._UMASK
+
+
+def test_write_keeps_mode(tmp_path):
+    path = str(tmp_path / "docker-compose.env")
+    docker_compose_utils._write_file(path, "contents\n")
+    os.chmod(path, 0o600)
+    docker_compose_utils._write_file(path, "other\n")
+    assert _get_mode(path) == 0o600
+    assert _read(path) == "other\n"
+
+
+def test_write_failure(tmp_path):
+    path = str(tmp_path / "file.yml")
+    docker_compose_utils._write_file(path, "contents\n")
+    with mock.patch("os.replace", side_effect=OSError("failed")), pytest.raises(
+        OSError
+    ):
+        docker_compose_utils._write_file(path, "other\n")
+    # The original file is kept and the temporary file is removed
+    assert _read(path) == "contents\n"
+    assert os.listdir(tmp_path) == ["file.yml"]
@@ -0,0 +1,126 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import os
+from unittest import mock
+
+import pytest
+
+from pydc_control import docker_utils, yaml_utils
+
+
+def _write_docker_compose(path: str, service_names) -> None:
+    with open(path, "w", encoding="utf8") as fobj:
+        yaml_utils.safe_dump(
+            {"services": {name: {"image": "image1"} for name in service_names}}, fobj
+        )
+
+
+def test_read_services_from_dc(tmp_path):
+    dc_path = os.path.join(tmp_path, "docker-compose.yml")
+    _write_docker_compose(dc_path, ["service1", "service2"])
+    assert docker_utils.read_services_from_dc(dc_path) == ["service1", "service2"]
+
+    # Changed files must be read again
+    _write_docker_compose(dc_path, ["service1", "service2", "service3"])
+    assert docker_utils.read_services_from_dc(dc_path) == [
+        "service1",
+        "service2",
+        "service3",
+    ]
+
+
+@pytest.mark.parametrize(
+    "contents, service_names",
+    [
+        ("", []),
+        ("version: '3'\n", []),
+        ("services:\n", []),
+        (
+            "x-base: &base\n  image: image1\nservices:\n  service1: *base\n  service2:\n    <<: *base\n",
+            ["service1", "service2"],
+        ),
+        (
+            "x-services: &services\n  service1: {}\nservices:\n  <<: *services\n  service2: {}\n",
+            ["service1", "service2"],
+        ),
+    ],
+)
+def test_read_services_from_dc_contents(tmp_path, contents, service_names):
+    dc_path = os.path.join(tmp_path, "docker-compose.yml")
+    with open(dc_path, "w", encoding="utf8") as fobj:
+        fobj.write(contents)
+    assert docker_utils.read_services_from_dc(dc_path) == service_names
+
+
+@pytest.mark.parametrize(
+    "env_command, docker_compose_path, command",
+    [
+        (None, None, ("docker", "compose")),
+        (None, "/usr/bin/docker-compose", ("docker-compose",)),
+        ("docker compose", "/usr/bin/docker-compose", ("docker", "compose")),
+        ("/opt/bin/docker-compose", None, ("/opt/bin/docker-compose",)),
+    ],
+)
+def test_get_docker_compose_command(env_command, docker_compose_path, command):
+    docker_utils.get_docker_compose_command.cache_clear()
+    env = {} if env_command is None else {"PYDC_CONTROL_DOCKER_COMPOSE": env_command}
+    with mock.patch.dict(os.environ, env), mock.patch(
+        "shutil.which", return_value=docker_compose_path
+    ), mock.patch("subprocess.call") as call:
+        if env_command is None:
+            os.environ.pop("PYDC_CONTROL_DOCKER_COMPOSE", None)
+        assert docker_utils.get_docker_compose_command() == command
+    # Choosing the command does not need to run docker
+    call.assert_not_called()
+    docker_utils.get_docker_compose_command.cache_clear()
+
+
+def test_check_port():
+    responses = iter([False, False, False, True])
+    with mock.patch.object(
+        docker_utils, "_is_path_responding", side_effect=lambda *_: next(responses)
+    ) as is_path_responding, mock.patch("time.sleep") as sleep:
+        docker_utils.check_port("container1", 8080, "/health")
+    assert is_path_responding.call_args == mock.call(8080, "/health")
+    delays = [call.args[0] for call in sleep.call_args_list]
+    assert delays == pytest.approx([0.1, 0.15, 0.225])
+
+
+def test_check_port_max_delay():
+    responses = iter([False] * 20 + [True])
+    with mock.patch.object(
+        docker_utils, "_is_path_responding", side_effect=lambda *_: next(responses)
+    ), mock.patch("time.sleep") as sleep:
+        docker_utils.check_port("container1", 8080, "/health")
+    assert sleep.call_args == mock.call(docker_utils._CHECK_PORT_MAX_DELAY)
+
+
+def test_get_open_ports():
+    output = b"80/tcp -> 0.0.0.0:8080\n80/tcp -> [::]:8080\n53/udp -> 0.0.0.0:53\n443/tcp -> 0.0.0.0:8443\n"
+    with mock.patch("subprocess.check_output", return_value=output) as check_output:
+        assert docker_utils.get_open_ports("container1") == {80: 8080, 443: 8443}
+    assert check_output.call_args == mock.call(["docker", "port", "container1"])
+
+
+def test_check_docker_network():
+    docker_utils._check_docker_network.cache_clear()
+    with mock.patch.object(
+        docker_utils.config, "get_dc_network", return_value="network1"
+    ), mock.patch("subprocess.call", return_value=1) as call, mock.patch(
+        "subprocess.check_call"
+    ) as check_call:
+        docker_utils.check_docker_network()
+        docker_utils.check_docker_network()
+    # The network is only inspected and created once
+    assert call.call_count == 1
+    assert call.call_args.args[0] == ["docker", "network", "inspect", "network1"]
+    assert check_call.call_count == 1
+    assert check_call.call_args.args[0] == ["docker", "network", "create", "network1"]
+    docker_utils._check_docker_network.cache_clear()
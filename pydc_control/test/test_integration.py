@@ -47,7 +47,11 @@ def _run_control_commands(args: List[str], working_dir: Optional[str] = None) ->
 
 
 def _get_pydc_containers(docker_client: docker.DockerClient) -> List[Container]:
-    running_containers = docker_client.containers.list()
+    # Let the docker daemon filter by name (a regular expression matched anywhere in the name) instead of
+    # listing every running container, the prefixes are still checked so only exact prefix matches are kept
+    running_containers = docker_client.containers.list(
+        filters={"name": "^/?pydc(dev)?_"}
+    )
     return list(
         container
         for container in running_containers
@@ -55,8 +59,9 @@ def _get_pydc_containers(docker_client: docker.DockerClient) -> List[Container]:
     )
 
 
-@pytest.fixture(name="docker_client")
+@pytest.fixture(name="docker_client", scope="session")
 def fixture_docker_client():
+    # Share the client (and its connection to the daemon) between all tests
     return docker.from_env()
 
 
@@ -0,0 +1,52 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+# pylint: disable=protected-access
+
+import logging
+
+from pydc_control import log
+
+
+def test_init_logger_single_handler():
+    root_logger = logging.getLogger()
+    log.init_logger(True)
+    handler_count = len(root_logger.handlers)
+
+    # Re-initializing, with the same or a different level, must not add handlers
+    log.init_logger(True)
+    assert len(root_logger.handlers) == handler_count
+    log.init_logger(False)
+    assert len(root_logger.handlers) == handler_count
+    assert log._HANDLER in root_logger.handlers
+    assert log._HANDLER.level == logging.INFO
+    assert root_logger.level == logging.INFO
+
+
+def test_init_logger_force():
+    root_logger = logging.getLogger()
+    log.init_logger(True)
+    handler = log._HANDLER
+    log.init_logger(True)
+    assert log._HANDLER is handler
+    # Forcing replaces the handler instead of adding another
+    log.init_logger(True, force=True)
+    assert log._HANDLER is not handler
+    assert handler not in root_logger.handlers
+    assert log._HANDLER in root_logger.handlers
+
+
+def test_logger_initializes_on_first_use():
+    root_logger = logging.getLogger()
+    log.init_logger(True)
+    root_logger.removeHandler(log._HANDLER)
+    log._HANDLER = None
+
+    # Modules used without run() still get their messages printed, with debug output like get_logger()
+    log.LOGGER.info("Logging from a library caller")
+    assert log._HANDLER in root_logger.handlers
+    assert log._HANDLER.level == logging.DEBUG
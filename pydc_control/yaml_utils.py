@@ -0,0 +1,40 @@
+"""
+Copyright 2021 Adobe
+All Rights Reserved.
+
+NOTICE: Adobe permits you to use, modify, and distribute this file in accordance
+with the terms of the Adobe license agreement accompanying it.
+"""
+
+from typing import IO, Any, Optional
+
+import yaml
+
+# Use the libyaml based loader/dumper when PyYAML was built with it, they are much faster than the pure Python ones
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+
+def safe_load(stream: IO) -> Any:
+    """
+    Equivalent to yaml.safe_load, but uses the C loader if available.
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def compose(stream: IO) -> Optional[yaml.Node]:
+    """
+    Equivalent to yaml.compose with the safe loader, but uses the C loader if available. Composing only builds
+    the representation nodes, which is much faster than constructing Python objects for the whole document.
+    """
+    return yaml.compose(stream, Loader=SafeLoader)
+
+
+def safe_dump(data: Any, stream: Optional[IO] = None) -> Optional[str]:
+    """
+    Equivalent to yaml.safe_dump, but uses the C dumper if available.
+    :return: the YAML document if no stream is given
+    """
+    return yaml.dump(data, stream, Dumper=SafeDumper)
@@ -12,9 +12,14 @@ if os.path.exists(version_file):
     with open(version_file, "r", encoding="utf8") as fobj:
         version = fobj.read().strip()
 else:
-    # Generate the version and store it in the file
+    # Generate the version and store it in the file, this only happens in a git checkout since sdists
+    # include the version file. Without git or a checkout this fails (showing the git error) instead of
+    # building with a made up version.
     result = subprocess.run(
-        "git rev-list --count HEAD", shell=True, capture_output=True, encoding="utf8"
+        ["git", "rev-list", "--count", "HEAD"],
+        stdout=subprocess.PIPE,
+        encoding="utf8",
+        check=True,
     )
     commit_count = result.stdout.strip()
     version = f"{MAJOR_VERSION}.{commit_count}"
@@ -22,7 +27,9 @@ else:
     with open(version_file, "w", encoding="utf8") as fobj:
         fobj.write(version)
 
-with open(os.path.join(os.path.dirname(__file__), "README.md")) as fobj:
+with open(
+    os.path.join(os.path.dirname(__file__), "README.md"), encoding="utf8"
+) as fobj:
     long_description = fobj.read().strip()
 
 setup(
@@ -37,6 +44,7 @@ setup(
     url="https://github.com/adobe/pydc-control",
     platforms=["Any"],
     packages=find_packages(exclude=("*test*",)),
+    python_requires=">=3.8",
     install_requires=(
         "Jinja2>=2.7.2",
         "PyYAML>=5.1.2",
@@ -49,9 +57,9 @@ setup(
         "Operating System :: OS Independent",
         "Programming Language :: Python",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
     ],
 )